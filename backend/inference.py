@@ -0,0 +1,108 @@
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from dotenv import load_dotenv
+
+# Settings below may come from .env; load it before reading them
+load_dotenv()
+
+# Threads running model inference, and how many more requests may wait for one
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "2"))
+INFERENCE_QUEUE_DEPTH = int(os.getenv("INFERENCE_QUEUE_DEPTH", "16"))
+
+
+class ExecutorSaturated(Exception):
+    """Raised when every worker is busy and the wait queue is full."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Inference capacity exhausted")
+        self.retry_after = retry_after
+
+
+class InferenceExecutor():
+    """
+    Thread pool with admission control for CPU-heavy model inference.
+    At most `max_workers` calls run at once and at most `max_queue` wait;
+    anything beyond that is rejected immediately instead of slowing everyone down.
+    """
+
+    def __init__(self, max_workers: int = INFERENCE_WORKERS, max_queue: int = INFERENCE_QUEUE_DEPTH):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="inference")
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self._lock = threading.Lock()
+
+        self._admitted = 0
+        self._running = 0
+        self._rejected = 0
+        self._completed = 0
+        self._failed = 0
+        self._total_wait = 0.0
+        self._total_run = 0.0
+
+    def _run(self, enqueued_at: float, fn, args, kwargs):
+        started_at = time.perf_counter()
+        with self._lock:
+            self._running += 1
+            self._total_wait += started_at - enqueued_at
+        try:
+            result = fn(*args, **kwargs)
+            failed = False
+            return result
+        except Exception:
+            failed = True
+            raise
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._total_run += time.perf_counter() - started_at
+                if failed:
+                    self._failed += 1
+                else:
+                    self._completed += 1
+            self._slots.release()
+
+    def retry_after(self) -> int:
+        """Rough seconds until a slot frees up, for the Retry-After header."""
+        with self._lock:
+            finished = self._completed + self._failed
+            avg_run = self._total_run / finished if finished else 1.0
+        return max(1, round(avg_run * (self.max_queue / self.max_workers + 1)))
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        """Schedule fn(*args, **kwargs), or raise ExecutorSaturated without waiting."""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise ExecutorSaturated(self.retry_after())
+
+        with self._lock:
+            self._admitted += 1
+        try:
+            return self._executor.submit(self._run, time.perf_counter(), fn, args, kwargs)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def metrics(self) -> dict:
+        with self._lock:
+            finished = self._completed + self._failed
+            in_flight = self._admitted - finished
+            return {
+                "workers": self.max_workers,
+                "queue_depth": self.max_queue,
+                "running": self._running,
+                "queued": in_flight - self._running,
+                "admitted_total": self._admitted,
+                "rejected_total": self._rejected,
+                "completed_total": self._completed,
+                "failed_total": self._failed,
+                "avg_wait_ms": round(1000 * self._total_wait / finished, 2) if finished else 0.0,
+                "avg_inference_ms": round(1000 * self._total_run / finished, 2) if finished else 0.0
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
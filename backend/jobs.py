@@ -0,0 +1,427 @@
+import csv
+import io
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+from datetime import datetime
+
+from dotenv import load_dotenv
+
+from backend import storage
+from backend.predictor import format_response
+
+# Settings below may come from .env; load it before reading them
+load_dotenv()
+
+# Separate file so queue traffic doesn't contend with the prediction history writes
+JOBS_DB_PATH = os.getenv("JOBS_DB_PATH", "jobs.db")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "1"))
+JOB_BATCH_SIZE = int(os.getenv("JOB_BATCH_SIZE", "256"))
+# Rows read per block when ingesting uploads and streaming results
+IO_BLOCK_SIZE = 1000
+IDLE_POLL_SECONDS = 5
+# Pause before retrying a batch after a storage error (e.g. a locked database)
+RETRY_DELAY_SECONDS = 5
+
+ITEM_FIELDS = ("statement", "fullText_based_content", "speaker", "sources")
+UPLOAD_FORMATS = (".csv", ".jsonl", ".ndjson")
+
+# Article text in CSV uploads can be far longer than the csv module's 128 KB default
+csv.field_size_limit(16 * 1024 * 1024)
+
+
+def _connect(db_path: str = JOBS_DB_PATH) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.execute("PRAGMA journal_mode = WAL")
+    return conn
+
+
+def init_jobs_db(db_path: str = JOBS_DB_PATH):
+    """Create the job queue tables."""
+    conn = _connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY,
+            status TEXT NOT NULL,
+            created_by TEXT,
+            save_to_history INTEGER DEFAULT 0,
+            total_items INTEGER DEFAULT 0,
+            processed_items INTEGER DEFAULT 0,
+            failed_items INTEGER DEFAULT 0,
+            created_at TEXT,
+            updated_at TEXT,
+            completed_at TEXT
+        )
+    """)
+    # payload is zlib-compressed JSON, dropped once the item has a result
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS job_items (
+            job_id TEXT NOT NULL,
+            seq INTEGER NOT NULL,
+            status TEXT NOT NULL,
+            payload BLOB,
+            result TEXT,
+            error TEXT,
+            PRIMARY KEY (job_id, seq)
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_job_items_status ON job_items(status, job_id, seq)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, created_at)")
+    conn.commit()
+    conn.close()
+
+
+def _clean_item(raw: dict) -> dict:
+    if not isinstance(raw, dict):
+        raise ValueError(f"Each item must be an object with {', '.join(ITEM_FIELDS)} fields, got {type(raw).__name__}")
+    return {field: str(raw.get(field) or "") for field in ITEM_FIELDS}
+
+
+def iter_upload_items(file_obj, filename: str):
+    """Yield input dicts from an uploaded .csv or .jsonl/.ndjson file, one row at a time."""
+    name = (filename or "").lower()
+    if not name.endswith(UPLOAD_FORMATS):
+        raise ValueError(f"Unsupported file type, expected one of: {', '.join(UPLOAD_FORMATS)}")
+
+    # utf-8-sig drops the byte-order mark spreadsheet exports put before the first header
+    text = io.TextIOWrapper(file_obj, encoding="utf-8-sig", newline="")
+    if name.endswith(".csv"):
+        for row in csv.DictReader(text):
+            yield row
+    else:
+        for line_number, line in enumerate(text, start=1):
+            if not line.strip():
+                continue
+            try:
+                item = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Invalid JSON on line {line_number}: {e}")
+            if not isinstance(item, dict):
+                raise ValueError(f"Line {line_number} is not a JSON object")
+            yield item
+
+
+def create_job(items, created_by: str, save_to_history: bool = False, db_path: str = JOBS_DB_PATH) -> dict:
+    """
+    Persist a job and its work items in one transaction and return its summary.
+    `items` may be any iterable of dicts; it is consumed in blocks.
+    Items without a statement or article text are recorded as failed up front.
+    """
+    job_id = uuid.uuid4().hex
+    now = datetime.now().isoformat()
+    conn = _connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute("""
+        INSERT INTO jobs (id, status, created_by, save_to_history, created_at, updated_at)
+        VALUES (?, 'queued', ?, ?, ?, ?)
+    """, (job_id, created_by, int(save_to_history), now, now))
+
+    total = 0
+    invalid = 0
+    block = []
+    try:
+        for raw in items:
+            item = _clean_item(raw)
+            if item["statement"] or item["fullText_based_content"]:
+                block.append((job_id, total, "pending", zlib.compress(json.dumps(item).encode("utf-8")), None))
+            else:
+                block.append((job_id, total, "failed", None, "Either 'statement' or 'fullText_based_content' must be provided."))
+                invalid += 1
+            total += 1
+            if len(block) >= IO_BLOCK_SIZE:
+                cursor.executemany("INSERT INTO job_items (job_id, seq, status, payload, error) VALUES (?, ?, ?, ?, ?)", block)
+                block = []
+        if block:
+            cursor.executemany("INSERT INTO job_items (job_id, seq, status, payload, error) VALUES (?, ?, ?, ?, ?)", block)
+    except Exception:
+        conn.rollback()
+        conn.close()
+        raise
+
+    if total == 0:
+        conn.rollback()
+        conn.close()
+        raise ValueError("Job contains no items")
+
+    status = "completed" if invalid == total else "queued"
+    cursor.execute("""
+        UPDATE jobs
+        SET total_items = ?, processed_items = ?, failed_items = ?, status = ?,
+            completed_at = CASE WHEN ? = 'completed' THEN ? END
+        WHERE id = ?
+    """, (total, invalid, invalid, status, status, now, job_id))
+    conn.commit()
+    conn.close()
+    return get_job(job_id, db_path)
+
+
+def get_job(job_id: str, db_path: str = JOBS_DB_PATH):
+    """Job summary with progress, or None if it doesn't exist."""
+    conn = _connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT id, status, created_by, save_to_history, total_items, processed_items,
+               failed_items, created_at, updated_at, completed_at
+        FROM jobs WHERE id = ?
+    """, (job_id,))
+    row = cursor.fetchone()
+    conn.close()
+    if row is None:
+        return None
+
+    total, processed = row[4], row[5]
+    return {
+        "job_id": row[0],
+        "status": row[1],
+        "created_by": row[2],
+        "save_to_history": bool(row[3]),
+        "total_items": total,
+        "processed_items": processed,
+        "failed_items": row[6],
+        "progress": round(100 * processed / total, 2) if total else 0.0,
+        "created_at": row[7],
+        "updated_at": row[8],
+        "completed_at": row[9]
+    }
+
+
+def iter_results(job_id: str, after_seq: int = -1, db_path: str = JOBS_DB_PATH):
+    """Yield finished items as NDJSON lines in input order, reading in blocks."""
+    conn = _connect(db_path)
+    cursor = conn.cursor()
+    try:
+        while True:
+            cursor.execute("""
+                SELECT seq, status, result, error FROM job_items
+                WHERE job_id = ? AND seq > ? AND status IN ('done', 'failed')
+                ORDER BY seq
+                LIMIT ?
+            """, (job_id, after_seq, IO_BLOCK_SIZE))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            for seq, item_status, result, error in rows:
+                line = {"seq": seq, "status": item_status}
+                if item_status == "done":
+                    line["result"] = json.loads(result)
+                else:
+                    line["error"] = error
+                yield json.dumps(line) + "\n"
+            after_seq = rows[-1][0]
+    finally:
+        conn.close()
+
+
+class JobWorkerPool():
+    """
+    Background threads that drain the job queue in batches, scoring each batch with one model pass.
+    Items are claimed ('running') before inference; recover() returns claims left by a
+    crashed or restarted process to 'pending', so jobs resume where they left off.
+    Only prediction errors fail an item: if saving to history or the queue itself
+    fails, the batch is put back to 'pending' and retried.
+    """
+
+    def __init__(self, workers: int = JOB_WORKERS, batch_size: int = JOB_BATCH_SIZE,
+                 db_path: str = JOBS_DB_PATH):
+        self.workers = workers
+        self.batch_size = batch_size
+        self.db_path = db_path
+        self.predictor = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+
+    def recover(self) -> int:
+        conn = _connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute("UPDATE job_items SET status = 'pending' WHERE status = 'running'")
+        recovered = cursor.rowcount
+        conn.commit()
+        conn.close()
+        if recovered:
+            print(f"Re-queued {recovered} job items interrupted by a restart")
+        return recovered
+
+    def start(self, predictor):
+        self.predictor = predictor
+        self.recover()
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"job-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def notify(self):
+        """Wake idle workers after a new job was queued."""
+        self._wake.set()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def _claim(self):
+        """Atomically claim the next batch of pending items of the oldest unfinished job."""
+        conn = _connect(self.db_path)
+        conn.isolation_level = None
+        cursor = conn.cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute("""
+                SELECT id, save_to_history FROM jobs
+                WHERE status IN ('queued', 'running')
+                  AND EXISTS (SELECT 1 FROM job_items WHERE job_id = jobs.id AND status = 'pending')
+                ORDER BY created_at
+                LIMIT 1
+            """)
+            job = cursor.fetchone()
+            if job is None:
+                cursor.execute("COMMIT")
+                return None
+            job_id, save_to_history = job
+
+            cursor.execute("""
+                SELECT seq, payload FROM job_items
+                WHERE job_id = ? AND status = 'pending'
+                ORDER BY seq
+                LIMIT ?
+            """, (job_id, self.batch_size))
+            rows = cursor.fetchall()
+            cursor.executemany(
+                "UPDATE job_items SET status = 'running' WHERE job_id = ? AND seq = ?",
+                [(job_id, seq) for seq, _ in rows]
+            )
+            cursor.execute(
+                "UPDATE jobs SET status = 'running', updated_at = ? WHERE id = ?",
+                (datetime.now().isoformat(), job_id)
+            )
+            cursor.execute("COMMIT")
+            items = [(seq, json.loads(zlib.decompress(payload))) for seq, payload in rows]
+            return job_id, bool(save_to_history), items
+        except Exception:
+            cursor.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def _predict(self, items: list) -> list:
+        """Return (result, features, error) per item; a failing batch is retried item by item."""
+        inputs = [item for _, item in items]
+        try:
+            _, results, features = self.predictor._score_batch(inputs)
+            return [(result, item_features, None) for result, item_features in zip(results, features)]
+        except Exception:
+            outcomes = []
+            for item in inputs:
+                try:
+                    _, results, features = self.predictor._score_batch([item])
+                    outcomes.append((results[0], features[0], None))
+                except Exception as e:
+                    outcomes.append((None, None, str(e)))
+            return outcomes
+
+    def _save(self, job_id: str, items: list, outcomes: list):
+        """
+        Write the successful predictions of a batch to the history in one transaction.
+        Items are recorded as saved in that same transaction, so a batch re-run after a
+        crash (before _complete) skips them instead of saving them twice.
+        """
+        saved = [
+            (seq, (item["statement"], item["fullText_based_content"], item["speaker"], item["sources"], result, features))
+            for (seq, item), (result, features, error) in zip(items, outcomes)
+            if error is None
+        ]
+        if saved:
+            self.predictor._save_batch_to_db(
+                [row for _, row in saved], job_id=job_id, seqs=[seq for seq, _ in saved]
+            )
+
+    def _release(self, job_id: str, items: list):
+        """Return claimed items to 'pending' so a later pass retries them."""
+        conn = _connect(self.db_path)
+        conn.executemany(
+            "UPDATE job_items SET status = 'pending' WHERE job_id = ? AND seq = ? AND status = 'running'",
+            [(job_id, seq) for seq, _ in items]
+        )
+        conn.commit()
+        conn.close()
+
+    def _complete(self, job_id: str, items: list, outcomes: list):
+        now = datetime.now().isoformat()
+        done = [
+            (json.dumps(format_response(result)), job_id, seq)
+            for (seq, _), (result, _, error) in zip(items, outcomes) if error is None
+        ]
+        failed = [(error, job_id, seq) for (seq, _), (_, _, error) in zip(items, outcomes) if error is not None]
+
+        conn = _connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.executemany(
+            "UPDATE job_items SET status = 'done', result = ?, payload = NULL WHERE job_id = ? AND seq = ?", done
+        )
+        cursor.executemany(
+            "UPDATE job_items SET status = 'failed', error = ?, payload = NULL WHERE job_id = ? AND seq = ?", failed
+        )
+        cursor.execute("""
+            UPDATE jobs
+            SET processed_items = processed_items + ?, failed_items = failed_items + ?, updated_at = ?
+            WHERE id = ?
+        """, (len(items), len(failed), now, job_id))
+        cursor.execute("""
+            UPDATE jobs SET status = 'completed', completed_at = ?
+            WHERE id = ? AND NOT EXISTS (
+                SELECT 1 FROM job_items WHERE job_id = ? AND status IN ('pending', 'running')
+            )
+        """, (now, job_id, job_id))
+        conn.commit()
+        conn.close()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                claimed = self._claim()
+            except Exception as e:
+                print(f"Job queue error: {e}")
+                claimed = None
+
+            if claimed is None:
+                self._wake.wait(IDLE_POLL_SECONDS)
+                self._wake.clear()
+                continue
+
+            job_id, save_to_history, items = claimed
+            started = time.perf_counter()
+            try:
+                outcomes = self._predict(items)
+                if save_to_history:
+                    self._save(job_id, items, outcomes)
+            except Exception as e:
+                # Not the items' fault: hand them back and retry the batch later
+                print(f"Job {job_id}: batch of {len(items)} items re-queued after error: {e}")
+                try:
+                    self._release(job_id, items)
+                except Exception as release_error:
+                    # Left 'running'; recover() re-queues them on the next start
+                    print(f"Job {job_id}: could not re-queue items: {release_error}")
+                self._stop.wait(RETRY_DELAY_SECONDS)
+                continue
+
+            # History rows are already written, so retry the bookkeeping rather than the batch
+            while True:
+                try:
+                    self._complete(job_id, items, outcomes)
+                    break
+                except Exception as e:
+                    print(f"Job {job_id}: could not record results, retrying: {e}")
+                    if self._stop.wait(RETRY_DELAY_SECONDS):
+                        return
+            if save_to_history:
+                try:
+                    storage.clear_saved_job_items(self.predictor.db_path, job_id, [seq for seq, _ in items])
+                except Exception as e:
+                    # Leftover markers are harmless: these items are done and never re-run
+                    print(f"Job {job_id}: could not clear save markers: {e}")
+            print(f"Job {job_id}: processed {len(items)} items in {time.perf_counter() - started:.2f}s")
@@ -1,12 +1,23 @@
-from fastapi import FastAPI, HTTPException, Depends, status
+from fastapi import FastAPI, HTTPException, Depends, Query, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import OAuth2PasswordRequestForm
-import sqlite3
-from datetime import timedelta
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from datetime import date, datetime, timedelta
+from typing import Literal, Optional
+import asyncio
 import os
+import threading
+import time
 from dotenv import load_dotenv
-from backend.predictor import Predictor
-from backend.schemas import UserInput, CreateUser, Token
+from backend.predictor import Predictor, format_response
+from backend import jobs
+from backend.timeline import build_timeline
+from backend.search import search_history, InvalidSearchQuery
+from backend import storage
+from backend.inference import InferenceExecutor, ExecutorSaturated
+from backend.response_cache import conditional_json
+from backend.schemas import UserInput, CreateUser, Token, JobRequest
 from backend.auth import authenticate_user, create_access_token, create_user, get_current_active_user, get_admin_user, revoke_token, save_session, oauth2_scheme, ACCESS_TOKEN_EXPIRE_MINUTES
 
 # Load environment variables
@@ -34,33 +45,149 @@ app.add_middleware(
     allow_headers=["*"],  # Allow all headers
 )
 
-# Load model and vectorizer
-try:
-    predictor = Predictor()
-except Exception as e:
-    raise RuntimeError(f"Error loading model: {e}")
+# Prediction storage is initialized up front so history routes work while the model loads
+storage.init_db(storage.DB_PATH)
+
+# Persistent batch-job queue; workers start once the model is ready
+jobs.init_jobs_db()
+job_workers = jobs.JobWorkerPool()
+
+# Model and vectorizer are loaded in the background on startup (see /ready)
+predictor = None
+model_state = {"status": "loading", "error": None, "timings": {}}
+WARMUP_BATCH_SIZE = int(os.getenv("WARMUP_BATCH_SIZE", "32"))
+MODEL_LOADING_RETRY_AFTER = 5
+
+
+def _warmup_items(loaded: Predictor) -> list:
+    """Synthetic inputs covering known/unknown speakers and official/other sources."""
+    speakers = list(loaded.speaker_le.classes_[:4]) + ["unknown-speaker"]
+    return [
+        {
+            "statement": f"Warm-up statement number {i} about the economy and public health",
+            "fullText_based_content": "The senate passed the bill after a long debate on health care costs. " * (i % 4 + 1),
+            "speaker": speakers[i % len(speakers)],
+            "sources": "https://example.gov/report;https://example.com/news" if i % 2 else ""
+        }
+        for i in range(WARMUP_BATCH_SIZE)
+    ]
+
+
+def _load_model():
+    global predictor
+    started = time.perf_counter()
+    try:
+        loaded = Predictor()
+
+        # Run the real code paths once so the first request doesn't pay cold-cache costs
+        warmup_started = time.perf_counter()
+        items = _warmup_items(loaded)
+        loaded.predict_batch(items, save=False)
+        loaded.predict(**items[0], save=False)
+
+        model_state["timings"] = {
+            **loaded.load_timings,
+            "warmup": round(time.perf_counter() - warmup_started, 3),
+            "total": round(time.perf_counter() - started, 3)
+        }
+        predictor = loaded
+        model_state["status"] = "ready"
+        print(f"Model ready: {model_state['timings']}")
+        job_workers.start(loaded)
+    except Exception as e:
+        model_state["status"] = "failed"
+        model_state["error"] = str(e)
+        print(f"Error loading model: {e}")
+
+
+def _require_model() -> Predictor:
+    """Return the loaded predictor, or 503 while it is still loading."""
+    if predictor is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"ML model not available (status: {model_state['status']})",
+            headers={"Retry-After": str(MODEL_LOADING_RETRY_AFTER)}
+        )
+    return predictor
+
+
+@app.on_event("startup")
+def start_model_loading():
+    threading.Thread(target=_load_model, name="model-loader", daemon=True).start()
+
+
+# Bounded pool for model inference, separate from the threadpool serving other routes
+inference_executor = InferenceExecutor()
 
 
-#Health check endpoint for AWS ALB/ECS
+# Background storage maintenance (retention/archival + incremental compaction)
+MAINTENANCE_INTERVAL_SECONDS = int(os.getenv("MAINTENANCE_INTERVAL_SECONDS", "3600"))
+maintenance_stop = threading.Event()
+
+
+def _maintenance_loop():
+    while True:
+        try:
+            result = storage.run_maintenance(storage.DB_PATH)
+            print(f"Storage maintenance finished: {result}")
+        except Exception as e:
+            print(f"Storage maintenance error: {e}")
+        if maintenance_stop.wait(MAINTENANCE_INTERVAL_SECONDS):
+            break
+
+
+@app.on_event("startup")
+def start_maintenance():
+    if MAINTENANCE_INTERVAL_SECONDS > 0:
+        threading.Thread(target=_maintenance_loop, name="storage-maintenance", daemon=True).start()
+
+
+@app.on_event("shutdown")
+def stop_maintenance():
+    maintenance_stop.set()
+    inference_executor.shutdown()
+    job_workers.stop()
+
+
+#Health check endpoint for AWS ALB/ECS (liveness)
 @app.get("/health")
-def health_check():
+async def health_check():
     """
-    Health check endpoint for load balancers and container orchestration.
-    Returns 200 if the service is healthy.
+    Liveness probe for container orchestration.
+    Returns 200 while the process is up, including while the model is still loading;
+    only a failed model load is reported as unhealthy. Use /ready for traffic routing.
+    Runs on the event loop, so it answers even while every inference worker is busy.
     """
-    try:
-        # Check if predictor is loaded
-        if predictor is None or predictor.model is None:
-            raise HTTPException(status_code=503, detail="ML model not loaded")
+    if model_state["status"] == "failed":
+        raise HTTPException(status_code=503, detail=f"Service unhealthy: {model_state['error']}")
 
-        return {
-            "status": "healthy",
-            "service": "Fake News Detection API",
-            "version": "1.0.0",
-            "model_loaded": True
-        }
-    except Exception as e:
-        raise HTTPException(status_code=503, detail=f"Service unhealthy: {str(e)}")
+    return {
+        "status": "healthy",
+        "service": "Fake News Detection API",
+        "version": "1.0.0",
+        "model_loaded": predictor is not None
+    }
+
+
+#Readiness check endpoint for AWS ALB target groups
+@app.get("/ready")
+async def readiness_check():
+    """
+    Readiness probe: 200 once the model is loaded and warmed up, 503 before that.
+    Includes the load and warm-up timings.
+    """
+    if model_state["status"] != "ready":
+        raise HTTPException(
+            status_code=503,
+            detail={"status": model_state["status"], "error": model_state["error"]},
+            headers={"Retry-After": str(MODEL_LOADING_RETRY_AFTER)}
+        )
+
+    return {
+        "status": "ready",
+        "model_loaded": True,
+        "load_timings": model_state["timings"]
+    }
 
 
 #Root endpoint
@@ -74,100 +201,245 @@ def read_root():
         "version": "1.0.0",
         "status": "running",
         "docs": "/docs",
-        "health": "/health"
+        "health": "/health",
+        "ready": "/ready"
     }
 
 
 #Prediction endpoint (POST)
 @app.post("/predict")
-def predict_news(input_data: UserInput):
+async def predict_news(input_data: UserInput):
     """
     Takes user input and returns the model's prediction.
+    Returns 503 with Retry-After when the inference queue is full.
     """
+    model = _require_model()
     try:
-        result = predictor.predict(
+        future = inference_executor.submit(
+            model.predict,
             statement=input_data.statement,
             fullText_based_content=input_data.fullText_based_content,
             speaker=input_data.speaker,
             sources=input_data.sources
         )
+    except ExecutorSaturated as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Prediction service is at capacity, please retry later",
+            headers={"Retry-After": str(e.retry_after)}
+        )
 
-        return {
-            "prediction": result["prediction"],
-            "confidence": result["confidence"],
-            "probabilities": result["probabilities"],
-            "details": result["extracted_features"],
-            "trust_indicators": result["trust_indicators"],
-            "explainability": result["explainability"],
-            "metadata": result["metadata"]
-        }
+    try:
+        result = await asyncio.wrap_future(future)
+
+        return format_response(result)
 
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
+#Inference executor metrics (GET)
+@app.get("/metrics/inference")
+async def inference_metrics():
+    """
+    Queue and worker statistics of the inference executor.
+    """
+    return inference_executor.metrics()
+
+
+#Submit a batch prediction job (POST)
+@app.post("/jobs", status_code=status.HTTP_202_ACCEPTED)
+async def submit_job(request: Request, current_user: dict = Depends(get_current_active_user)):
+    """
+    Queue a large batch of inputs for background prediction.
+    Accepts either a JSON body ({"items": [...], "save_to_history": false}) or a
+    multipart upload with a .csv or .jsonl `file` (columns/keys as in /predict).
+    Work items are persisted, so the job survives restarts.
+    """
+    content_type = request.headers.get("content-type", "")
+    try:
+        if content_type.startswith("multipart/form-data"):
+            form = await request.form()
+            upload = form.get("file")
+            if upload is None or not hasattr(upload, "file"):
+                raise HTTPException(status_code=400, detail="Missing 'file' upload")
+            save_to_history = str(form.get("save_to_history", "false")).lower() in ("1", "true", "yes")
+            items = jobs.iter_upload_items(upload.file, upload.filename)
+        else:
+            job_request = JobRequest.model_validate_json(await request.body())
+            save_to_history = job_request.save_to_history
+            items = (item.model_dump() for item in job_request.items)
+
+        job = await asyncio.to_thread(jobs.create_job, items, current_user["username"], save_to_history)
+
+    except HTTPException:
+        raise
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False, include_input=False))
+    except (ValueError, UnicodeDecodeError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Job submission error: {e}")
+
+    job_workers.notify()
+    job["status_url"] = f"/jobs/{job['job_id']}"
+    job["results_url"] = f"/jobs/{job['job_id']}/results"
+    return job
+
+
+def _get_own_job(job_id: str, current_user: dict) -> dict:
+    """Load a job visible to the current user (its creator or an admin), else 404."""
+    job = jobs.get_job(job_id)
+    if job is None or (job["created_by"] != current_user["username"] and not current_user.get("is_admin", False)):
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
+
+
+#Batch job progress (GET)
+@app.get("/jobs/{job_id}")
+def get_job_status(job_id: str, current_user: dict = Depends(get_current_active_user)):
+    """
+    Status and progress of a batch job.
+    """
+    return _get_own_job(job_id, current_user)
+
+
+#Batch job results (GET)
+@app.get("/jobs/{job_id}/results")
+def get_job_results(job_id: str, after: int = -1, current_user: dict = Depends(get_current_active_user)):
+    """
+    Stream the finished items of a job as NDJSON, in input order.
+    Can be polled while the job runs; pass `after` (last seq received) to resume.
+    """
+    _get_own_job(job_id, current_user)
+    return StreamingResponse(jobs.iter_results(job_id, after), media_type="application/x-ndjson")
+
+
 #Retrieve all stored predictions (GET)
 @app.get("/history")
-def get_prediction_history():
+def get_prediction_history(request: Request):
     """
     Retrieve all past predictions from the SQLite database.
+    Supports conditional GET (ETag / If-None-Match): unchanged history returns 304.
     """
     try:
-        conn = sqlite3.connect(predictor.db_path)
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM predictions ORDER BY id DESC")
-        rows = cursor.fetchall()
-        conn.close()
+        max_id, deletes, modified_at = storage.history_version(storage.DB_PATH)
+        return conditional_json(request, "history", f"{max_id}.{deletes}", modified_at, _load_history)
 
-        # Format results as list of dicts
-        history = []
-        for row in rows:
-            # Handle both old and new schema (for backward compatibility)
-            history_item = {
-                "id": row[0],
-                "statement": row[1],
-                "fullText_based_content": row[2],
-                "speaker": row[3],
-                "sources": row[4],
-                "prediction": row[5],
-                "confidence": row[6],
-                "num_sources": row[7],
-                "has_official_source": bool(row[8])
-            }
-            # Add new fields if they exist
-            if len(row) > 9:
-                history_item["risk_level"] = row[9]
-                history_item["timestamp"] = row[10]
-                history_item["input_completeness"] = row[11]
-
-            history.append(history_item)
-        return {"total_records": len(history), "data": history}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {e}")
 
+
+def _load_history() -> dict:
+    conn = storage.connect(storage.DB_PATH)
+    cursor = conn.cursor()
+    rows = storage.fetch_history(cursor, "ORDER BY id DESC")
+    conn.close()
+
+    # Format results as list of dicts
+    history = []
+    for row in rows:
+        # Handle both old and new schema (for backward compatibility)
+        history_item = {
+            "id": row[0],
+            "statement": row[1],
+            "fullText_based_content": row[2],
+            "speaker": row[3],
+            "sources": row[4],
+            "prediction": row[5],
+            "confidence": row[6],
+            "num_sources": row[7],
+            "has_official_source": bool(row[8])
+        }
+        # Add new fields if they exist
+        if len(row) > 9:
+            history_item["risk_level"] = row[9]
+            history_item["timestamp"] = row[10]
+            history_item["input_completeness"] = row[11]
+
+        history.append(history_item)
+    return {"total_records": len(history), "data": history}
+
+
+def _timeline_bound(name: str, value: Optional[str]) -> Optional[str]:
+    """Normalize an ISO timestamp query parameter to the local, naive form stored in history."""
+    if value is None:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"'{name}' must be an ISO 8601 timestamp")
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed.isoformat()
+
+
+#Downsampled timeline for the history charts (GET)
+@app.get("/history/timeline")
+def get_history_timeline(
+    request: Request,
+    bucket: Literal["auto", "hour", "day"] = "auto",
+    points: int = Query(500, ge=10, le=5000, description="Maximum buckets / series points returned"),
+    start: Optional[str] = Query(None, description="ISO timestamp, inclusive"),
+    end: Optional[str] = Query(None, description="ISO timestamp, exclusive")
+):
+    """
+    Time-bucketed prediction counts per label, day-of-week x hour heatmap cells and
+    LTTB-downsampled confidence series, aggregated in SQL so the response size is
+    bounded by `points` regardless of history length. Supports conditional GET.
+    """
+    start = _timeline_bound("start", start)
+    end = _timeline_bound("end", end)
+    try:
+        max_id, deletes, modified_at = storage.history_version(storage.DB_PATH)
+        key = f"timeline:{bucket}:{points}:{start}:{end}"
+        return conditional_json(
+            request, key, f"{max_id}.{deletes}", modified_at,
+            lambda: build_timeline(storage.DB_PATH, bucket, points, start, end)
+        )
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {e}")
+
+
+#Full-text search over prediction history (GET) - Admin only
+@app.get("/history/search")
+def search_prediction_history(
+    q: str = Query(..., min_length=1, max_length=500, description="Words, \"quoted phrases\" or prefix* terms"),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    admin_user: dict = Depends(get_admin_user)
+):
+    """
+    Find past predictions mentioning a name or phrase in the statement, article
+    text or speaker. Results are BM25-ranked, paginated and include highlighted snippets.
+    Requires admin privileges.
+    """
+    try:
+        return search_history(storage.DB_PATH, q, page, page_size)
+
+    except InvalidSearchQuery as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error: {e}")
 
 
 #Delete a specific prediction by ID (DELETE) - Admin only
 @app.delete("/history/{prediction_id}")
-async def delete_prediction(prediction_id: int, admin_user: dict = Depends(get_admin_user)):
+def delete_prediction(prediction_id: int, admin_user: dict = Depends(get_admin_user)):
     """
     Delete a specific prediction from the database by its ID.
     Requires admin privileges.
     """
     try:
-        conn = sqlite3.connect(predictor.db_path)
+        conn = storage.connect(storage.DB_PATH)
         cursor = conn.cursor()
 
-        # Check if the prediction exists
-        cursor.execute("SELECT id FROM predictions WHERE id = ?", (prediction_id,))
-        result = cursor.fetchone()
-
-        if not result:
+        # Delete the prediction (and any text no other prediction references)
+        if not storage.delete_prediction(cursor, prediction_id):
             conn.close()
             raise HTTPException(status_code=404, detail=f"Prediction with ID {prediction_id} not found")
 
-        # Delete the prediction
-        cursor.execute("DELETE FROM predictions WHERE id = ?", (prediction_id,))
         conn.commit()
         conn.close()
 
@@ -261,118 +533,118 @@ async def read_users_me(current_user: dict = Depends(get_current_active_user)):
 
 #Get model performance metrics (GET) - Admin only
 @app.get("/admin/model-performance")
-async def get_model_performance(admin_user: dict = Depends(get_admin_user)):
+def get_model_performance(request: Request, admin_user: dict = Depends(get_admin_user)):
     """
     Get comprehensive model performance metrics.
     Requires admin privileges.
+    Supports conditional GET (ETag / If-None-Match): unchanged metrics return 304.
     """
     try:
-        conn = sqlite3.connect(predictor.db_path)
-        cursor = conn.cursor()
+        max_id, deletes, modified_at = storage.history_version(storage.DB_PATH)
+        # The 30-day window moves with the date even when no prediction changes
+        version = f"{max_id}.{deletes}.{date.today().isoformat()}"
+        return conditional_json(request, "model-performance", version, modified_at, _load_model_performance)
 
-        # Total predictions
-        cursor.execute("SELECT COUNT(*) FROM predictions")
-        total_predictions = cursor.fetchone()[0]
-
-        # Predictions by label
-        cursor.execute("""
-            SELECT prediction, COUNT(*) as count
-            FROM predictions
-            GROUP BY prediction
-        """)
-        prediction_distribution = dict(cursor.fetchall())
-
-        # Average confidence
-        cursor.execute("SELECT AVG(confidence) FROM predictions")
-        avg_confidence = cursor.fetchone()[0] or 0
-
-        # Confidence distribution
-        cursor.execute("""
-            SELECT
-                CASE
-                    WHEN confidence >= 0.9 THEN 'Very High (90-100%)'
-                    WHEN confidence >= 0.8 THEN 'High (80-90%)'
-                    WHEN confidence >= 0.7 THEN 'Medium (70-80%)'
-                    WHEN confidence >= 0.6 THEN 'Low (60-70%)'
-                    ELSE 'Very Low (<60%)'
-                END as confidence_range,
-                COUNT(*) as count
-            FROM predictions
-            GROUP BY confidence_range
-        """)
-        confidence_distribution = dict(cursor.fetchall())
-
-        # Risk level distribution
-        cursor.execute("""
-            SELECT risk_level, COUNT(*) as count
-            FROM predictions
-            WHERE risk_level IS NOT NULL
-            GROUP BY risk_level
-        """)
-        risk_distribution = dict(cursor.fetchall())
-
-        # Source quality metrics
-        cursor.execute("""
-            SELECT
-                AVG(num_sources) as avg_sources,
-                SUM(CASE WHEN has_official_source = 1 THEN 1 ELSE 0 END) as official_source_count,
-                AVG(input_completeness) as avg_completeness
-            FROM predictions
-        """)
-        source_metrics = cursor.fetchone()
-
-        # Predictions over time (last 30 days)
-        cursor.execute("""
-            SELECT
-                DATE(timestamp) as date,
-                COUNT(*) as count,
-                prediction
-            FROM predictions
-            WHERE timestamp >= datetime('now', '-30 days')
-            GROUP BY DATE(timestamp), prediction
-            ORDER BY date DESC
-        """)
-        temporal_data = cursor.fetchall()
-
-        # Recent predictions
-        cursor.execute("""
-            SELECT id, statement, prediction, confidence, timestamp
-            FROM predictions
-            ORDER BY timestamp DESC
-            LIMIT 10
-        """)
-        recent_predictions = [
-            {
-                "id": row[0],
-                "statement": row[1],
-                "prediction": row[2],
-                "confidence": row[3],
-                "timestamp": row[4]
-            }
-            for row in cursor.fetchall()
-        ]
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {e}")
 
-        conn.close()
 
-        return {
-            "total_predictions": total_predictions,
-            "prediction_distribution": prediction_distribution,
-            "avg_confidence": round(avg_confidence, 4),
-            "confidence_distribution": confidence_distribution,
-            "risk_distribution": risk_distribution,
-            "source_metrics": {
-                "avg_sources": round(source_metrics[0] or 0, 2),
-                "official_source_count": source_metrics[1] or 0,
-                "avg_completeness": round(source_metrics[2] or 0, 2)
-            },
-            "temporal_data": [
-                {"date": row[0], "count": row[1], "prediction": row[2]}
-                for row in temporal_data
-            ],
-            "recent_predictions": recent_predictions
+def _load_model_performance() -> dict:
+    conn = storage.connect(storage.DB_PATH)
+    cursor = conn.cursor()
+
+    # Total predictions
+    cursor.execute("SELECT COUNT(*) FROM predictions")
+    total_predictions = cursor.fetchone()[0]
+
+    # Predictions by label
+    cursor.execute("""
+        SELECT prediction, COUNT(*) as count
+        FROM predictions
+        GROUP BY prediction
+    """)
+    prediction_distribution = dict(cursor.fetchall())
+
+    # Average confidence
+    cursor.execute("SELECT AVG(confidence) FROM predictions")
+    avg_confidence = cursor.fetchone()[0] or 0
+
+    # Confidence distribution
+    cursor.execute("""
+        SELECT
+            CASE
+                WHEN confidence >= 0.9 THEN 'Very High (90-100%)'
+                WHEN confidence >= 0.8 THEN 'High (80-90%)'
+                WHEN confidence >= 0.7 THEN 'Medium (70-80%)'
+                WHEN confidence >= 0.6 THEN 'Low (60-70%)'
+                ELSE 'Very Low (<60%)'
+            END as confidence_range,
+            COUNT(*) as count
+        FROM predictions
+        GROUP BY confidence_range
+    """)
+    confidence_distribution = dict(cursor.fetchall())
+
+    # Risk level distribution
+    cursor.execute("""
+        SELECT risk_level, COUNT(*) as count
+        FROM predictions
+        WHERE risk_level IS NOT NULL
+        GROUP BY risk_level
+    """)
+    risk_distribution = dict(cursor.fetchall())
+
+    # Source quality metrics
+    cursor.execute("""
+        SELECT
+            AVG(num_sources) as avg_sources,
+            SUM(CASE WHEN has_official_source = 1 THEN 1 ELSE 0 END) as official_source_count,
+            AVG(input_completeness) as avg_completeness
+        FROM predictions
+    """)
+    source_metrics = cursor.fetchone()
+
+    # Predictions over time (last 30 days)
+    cursor.execute("""
+        SELECT
+            DATE(timestamp) as date,
+            COUNT(*) as count,
+            prediction
+        FROM predictions
+        WHERE timestamp >= datetime('now', '-30 days')
+        GROUP BY DATE(timestamp), prediction
+        ORDER BY date DESC
+    """)
+    temporal_data = cursor.fetchall()
+
+    # Recent predictions
+    recent_predictions = [
+        {
+            "id": row[0],
+            "statement": row[1],
+            "prediction": row[5],
+            "confidence": row[6],
+            "timestamp": row[10]
         }
+        for row in storage.fetch_history(cursor, "ORDER BY timestamp DESC LIMIT 10")
+    ]
 
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Database error: {e}")
-
+    conn.close()
 
+    return {
+        "total_predictions": total_predictions,
+        "prediction_distribution": prediction_distribution,
+        "avg_confidence": round(avg_confidence, 4),
+        "confidence_distribution": confidence_distribution,
+        "risk_distribution": risk_distribution,
+        "source_metrics": {
+            "avg_sources": round(source_metrics[0] or 0, 2),
+            "official_source_count": source_metrics[1] or 0,
+            "avg_completeness": round(source_metrics[2] or 0, 2)
+        },
+        "temporal_data": [
+            {"date": row[0], "count": row[1], "prediction": row[2]}
+            for row in temporal_data
+        ],
+        "recent_predictions": recent_predictions
+    }
@@ -1,8 +1,44 @@
 import joblib
 import os
+import time
+import hashlib
 import numpy as np
-import sqlite3
+from scipy.sparse import csr_matrix, hstack
 from datetime import datetime 
+from backend import storage
+
+
+def pack_text_features(text_features) -> tuple:
+    """Pack a 1-row sparse TF-IDF matrix into (nnz, indices blob, values blob).
+
+    Values are stored as float32: the forest casts its input to float32 before
+    traversing the trees, so no precision the model can see is lost.
+    """
+    row = text_features.tocsr()
+    indices = row.indices.astype(np.int32)
+    values = row.data.astype(np.float32)
+    return len(indices), indices.tobytes(), values.tobytes()
+
+
+def unpack_text_features(indices_blob: bytes, values_blob: bytes) -> tuple:
+    """Inverse of pack_text_features, returns (indices, values) arrays."""
+    indices = np.frombuffer(indices_blob, dtype=np.int32)
+    values = np.frombuffer(values_blob, dtype=np.float32)
+    return indices, values
+
+
+def format_response(result: dict) -> dict:
+    """Public API shape of a prediction result (as returned by /predict)."""
+    return {
+        "prediction": result["prediction"],
+        "confidence": result["confidence"],
+        "probabilities": result["probabilities"],
+        "details": result["extracted_features"],
+        "trust_indicators": result["trust_indicators"],
+        "explainability": result["explainability"],
+        "metadata": result["metadata"]
+    }
+
 
 class Predictor():
     def __init__(self):
@@ -14,18 +50,30 @@ class Predictor():
             if not os.path.exists(path):
                 raise FileNotFoundError(f'Required file not found: {path}')
         
+        # Seconds spent loading each artifact, reported by /ready
+        self.load_timings = {}
+
         try: 
             # Load Random Forest model
+            start = time.perf_counter()
             self.model = joblib.load(model_path)
-            print('Successfully loaded Random Forest model')
+            self.load_timings["model"] = round(time.perf_counter() - start, 3)
+            print(f'Successfully loaded Random Forest model ({self.load_timings["model"]}s)')
 
             # Load speaker label encoder
+            start = time.perf_counter()
             self.speaker_le = joblib.load(speaker_le_path)
+            self.load_timings["speaker_encoder"] = round(time.perf_counter() - start, 3)
             print('Successfully loaded speaker label encoder')
 
             # Load word vector 
+            start = time.perf_counter()
             self.word_vector = joblib.load(word_vector_path)
-            print('Successfully loaded Word Vector')
+            self.load_timings["word_vector"] = round(time.perf_counter() - start, 3)
+            print(f'Successfully loaded Word Vector ({self.load_timings["word_vector"]}s)')
+
+            # Fingerprint of everything that shapes a stored feature vector
+            self.feature_version = self._compute_feature_version()
 
             #Initialize SQLite database
             self._init_db()
@@ -34,55 +82,68 @@ class Predictor():
             print(f'Error loading model file {e}')
             raise
 
+    def _compute_feature_version(self) -> str:
+        """Hash the vectorizer vocabulary/idf and speaker classes.
+
+        Stored feature vectors are only reusable when this matches.
+        """
+        digest = hashlib.sha256()
+        for term, index in sorted(self.word_vector.vocabulary_.items()):
+            digest.update(f'{term}\t{index}\n'.encode('utf-8'))
+        if hasattr(self.word_vector, 'idf_'):
+            digest.update(np.asarray(self.word_vector.idf_, dtype=np.float64).tobytes())
+        for speaker in self.speaker_le.classes_:
+            digest.update(f'{speaker}\n'.encode('utf-8'))
+        return digest.hexdigest()[:16]
+
     def _init_db(self):
-        """Initialize SQLite database and table if not exist."""
-        self.db_path = "prediction.db"
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS predictions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                statement TEXT,
-                fullText_based_content TEXT,
-                speaker TEXT,
-                sources TEXT,
-                prediction TEXT,
-                confidence REAL,
-                num_sources INTEGER,
-                has_official_source INTEGER,
-                risk_level TEXT,
-                timestamp TEXT,
-                input_completeness REAL
-            )
-        """)
-        conn.commit()
-        conn.close()
+        """Initialize SQLite database and tables if not exist."""
+        self.db_path = storage.DB_PATH
+        storage.init_db(self.db_path)
         print("SQLite database initialized: prediction.db")
 
-    def _save_to_db(self, statement, fullText, speaker, sources, result):
+    def _save_to_db(self, statement, fullText, speaker, sources, result, features=None):
         """Save prediction result to SQLite database."""
-        conn = sqlite3.connect(self.db_path)
+        self._save_batch_to_db([(statement, fullText, speaker, sources, result, features)])
+        print("Prediction saved to SQLite database ")
+
+    def _save_batch_to_db(self, rows, job_id: str = None, seqs: list = None):
+        """
+        Save (statement, fullText, speaker, sources, result, features) rows in one transaction.
+        For batch jobs, `seqs` gives each row's item number: items already saved for `job_id`
+        are skipped and the rest are recorded, so re-running a batch never duplicates history.
+        """
+        conn = storage.connect(self.db_path)
         cursor = conn.cursor()
+        already_saved = storage.saved_job_items(cursor, job_id, seqs) if job_id is not None else set()
+        for index, (statement, fullText, speaker, sources, result, features) in enumerate(rows):
+            if job_id is not None and seqs[index] in already_saved:
+                continue
+            prediction_id = storage.insert_prediction(cursor, statement, fullText, speaker, sources, result)
+            if features is not None:
+                self._save_features(cursor, prediction_id, features)
+            if job_id is not None:
+                storage.mark_job_item_saved(cursor, job_id, seqs[index], prediction_id)
+        conn.commit()
+        conn.close()
+
+    def _save_features(self, cursor, prediction_id: int, features: dict):
+        """Write (or refresh) the stored feature vector of one prediction."""
+        nnz, indices_blob, values_blob = pack_text_features(features["text_features"])
         cursor.execute("""
-            INSERT INTO predictions
-            (statement, fullText_based_content, speaker, sources, prediction, confidence, num_sources, has_official_source, risk_level, timestamp, input_completeness)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            INSERT OR REPLACE INTO prediction_features
+            (prediction_id, feature_version, speaker_code, num_sources, has_official_source, nnz, text_indices, text_values)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
         """, (
-            statement,
-            fullText,
-            speaker,
-            sources,
-            result["prediction"],
-            result["confidence"],
-            result["extracted_features"]["num_sources"],
-            int(result["extracted_features"]["has_official_source"]),
-            result["trust_indicators"]["risk_level"],
-            result["metadata"]["timestamp"],
-            result["explainability"]["input_completeness"]
+            prediction_id,
+            self.feature_version,
+            int(features["speaker_code"]),
+            int(features["num_sources"]),
+            int(features["has_official_source"]),
+            nnz,
+            indices_blob,
+            values_blob
         ))
-        conn.commit()
-        conn.close()
-        print("Prediction saved to SQLite database ")
 
     def _process_speaker(self, speaker: str) -> int:
         speaker = speaker.lower().strip()
@@ -105,19 +166,30 @@ class Predictor():
                 break
         return num_sources, has_official_source
     
-    def _process_text(self, statement: str, fullText_based_context: str) -> np.ndarray:
+    def _vectorize_text(self, statement: str, fullText_based_context: str):
         combined_text = f'{statement} {fullText_based_context}'.strip()
-        text_features = self.word_vector.transform([combined_text])
-        return text_features.toarray()
-    
+        return self.word_vector.transform([combined_text])
+
+    def _process_text(self, statement: str, fullText_based_context: str) -> np.ndarray:
+        return self._vectorize_text(statement, fullText_based_context).toarray()
+
+    def extract_features(self, statement: str, fullText_based_content: str,
+                         speaker: str, sources: str) -> dict:
+        """Extract the raw (sparse) feature components of one input."""
+        num_sources, has_official_source = self._process_sources(sources)
+        return {
+            "speaker_code": self._process_speaker(speaker),
+            "num_sources": num_sources,
+            "has_official_source": has_official_source,
+            "text_features": self._vectorize_text(statement, fullText_based_content)
+        }
+
     def _prepare_features(self, statement: str, fullText_based_content: str,
                           speaker: str, sources: str):
-        speaker_encoded = self._process_speaker(speaker)
-        num_sources, has_official_source = self._process_sources(sources)
-        text_features = self._process_text(statement, fullText_based_content)
-        numeric_features = np.array([[speaker_encoded, num_sources, has_official_source]])
-        combined_features = np.hstack((numeric_features, text_features))
-        return combined_features, num_sources, has_official_source
+        features = self.extract_features(statement, fullText_based_content, speaker, sources)
+        numeric_features = np.array([[features["speaker_code"], features["num_sources"], features["has_official_source"]]])
+        combined_features = np.hstack((numeric_features, features["text_features"].toarray()))
+        return combined_features, features
 
     def _calculate_trust_indicators(self, confidence: float) -> dict:
         """Calculate risk level and confidence category based on confidence score."""
@@ -191,20 +263,11 @@ class Predictor():
             "speaker_recognized": speaker_recognized
         }
 
-    def predict(self, statement: str, fullText_based_content: str = "",
-                speaker: str = "", sources: str = "") -> dict:
-        if not statement and not fullText_based_content:
-            raise ValueError("Either 'statement' or 'fullText_based_content' must be provided.")
-
-        features, num_sources, has_official_source = self._prepare_features(
-            statement=statement or "",
-            fullText_based_content=fullText_based_content or "",
-            speaker=speaker or "",
-            sources=sources or ""
-        )
-
-        prediction = self.model.predict(features)[0]
-        probabilities = self.model.predict_proba(features)[0]
+    def _build_result(self, statement: str, fullText_based_content: str, speaker: str,
+                      sources: str, raw_features: dict, probabilities) -> dict:
+        num_sources = raw_features["num_sources"]
+        has_official_source = raw_features["has_official_source"]
+        prediction = self.model.classes_[int(np.argmax(probabilities))]
         confidence = float(max(probabilities))
 
         # Calculate trust indicators
@@ -220,7 +283,7 @@ class Predictor():
             has_official_source=has_official_source
         )
 
-        result = {
+        return {
             "prediction": "Real" if prediction == 1 else "Fake",
             "confidence": confidence,
             "probabilities": {
@@ -246,7 +309,81 @@ class Predictor():
             }
         }
 
+    def predict(self, statement: str, fullText_based_content: str = "",
+                speaker: str = "", sources: str = "", save: bool = True) -> dict:
+        if not statement and not fullText_based_content:
+            raise ValueError("Either 'statement' or 'fullText_based_content' must be provided.")
+
+        features, raw_features = self._prepare_features(
+            statement=statement or "",
+            fullText_based_content=fullText_based_content or "",
+            speaker=speaker or "",
+            sources=sources or ""
+        )
+
+        probabilities = self.model.predict_proba(features)[0]
+        result = self._build_result(statement, fullText_based_content, speaker, sources,
+                                    raw_features, probabilities)
+
         #Save result to SQLite
-        self._save_to_db(statement, fullText_based_content, speaker, sources, result)
+        if save:
+            self._save_to_db(statement, fullText_based_content, speaker, sources, result, raw_features)
+
+        return result
+
+    def predict_batch(self, items: list, save: bool = True) -> list:
+        """
+        Predict many inputs with one vectorizer call and one forest pass.
+        Each item is a dict with the UserInput fields; results keep the input order.
+        """
+        items, results, raw_features = self._score_batch(items)
+
+        if save:
+            self._save_batch_to_db([
+                (item["statement"], item["fullText_based_content"], item["speaker"], item["sources"], result, features)
+                for item, result, features in zip(items, results, raw_features)
+            ])
+
+        return results
+
+    def _score_batch(self, items: list) -> tuple:
+        """Return (normalized items, results, raw features) without touching the database."""
+        items = [
+            {
+                "statement": item.get("statement") or "",
+                "fullText_based_content": item.get("fullText_based_content") or "",
+                "speaker": item.get("speaker") or "",
+                "sources": item.get("sources") or ""
+            }
+            for item in items
+        ]
+        for index, item in enumerate(items):
+            if not item["statement"] and not item["fullText_based_content"]:
+                raise ValueError(f"Item {index}: either 'statement' or 'fullText_based_content' must be provided.")
+        if not items:
+            return [], [], []
+
+        text_matrix = self.word_vector.transform([
+            f'{item["statement"]} {item["fullText_based_content"]}'.strip() for item in items
+        ]).tocsr()
+        raw_features = []
+        for index, item in enumerate(items):
+            num_sources, has_official_source = self._process_sources(item["sources"])
+            raw_features.append({
+                "speaker_code": self._process_speaker(item["speaker"]),
+                "num_sources": num_sources,
+                "has_official_source": has_official_source,
+                "text_features": text_matrix[index]
+            })
+
+        numeric = csr_matrix(np.array([
+            [f["speaker_code"], f["num_sources"], f["has_official_source"]] for f in raw_features
+        ], dtype=np.float64))
+        probabilities = self.model.predict_proba(hstack((numeric, text_matrix)).tocsr())
 
-        return result
\ No newline at end of file
+        results = [
+            self._build_result(item["statement"], item["fullText_based_content"], item["speaker"],
+                               item["sources"], features, probs)
+            for item, features, probs in zip(items, raw_features, probabilities)
+        ]
+        return items, results, raw_features
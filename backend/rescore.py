@@ -0,0 +1,173 @@
+import argparse
+import re
+import time
+from datetime import datetime
+
+import joblib
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from backend import storage
+from backend.predictor import Predictor, unpack_text_features
+
+NUM_NUMERIC_FEATURES = 3
+
+
+def _results_table(model_version: str) -> str:
+    """Name of the per-model-version results table."""
+    slug = re.sub(r'[^0-9a-zA-Z_]', '_', model_version).strip('_')
+    if not slug:
+        raise ValueError(f"Invalid model version: {model_version!r}")
+    return f"rescore_{slug}"
+
+
+def _init_results_table(cursor, table: str):
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS {table} (
+            prediction_id INTEGER PRIMARY KEY,
+            original_prediction TEXT,
+            prediction TEXT,
+            confidence REAL,
+            prob_fake REAL,
+            prob_real REAL,
+            rescored_at TEXT
+        )
+    """)
+
+
+def _reextract(predictor: Predictor, cursor, prediction_ids: list) -> dict:
+    """Fallback for rows without a usable stored vector: re-extract from the text
+    and refresh the side table so the next run can use the fast path."""
+    placeholders = ",".join("?" * len(prediction_ids))
+    history = storage.fetch_history(cursor, f"WHERE id IN ({placeholders})", prediction_ids)
+
+    rows = {}
+    for prediction_id, statement, fullText, speaker, sources in (row[:5] for row in history):
+        features = predictor.extract_features(statement or "", fullText or "", speaker or "", sources or "")
+        predictor._save_features(cursor, prediction_id, features)
+        text_row = features["text_features"].tocsr()
+        rows[prediction_id] = (
+            features["speaker_code"],
+            features["num_sources"],
+            features["has_official_source"],
+            text_row.indices.astype(np.int32),
+            text_row.data.astype(np.float32)
+        )
+    return rows
+
+
+def _build_matrix(rows: list, num_text_features: int) -> csr_matrix:
+    """Stack stored vectors into one CSR matrix: 3 numeric columns, then TF-IDF."""
+    indptr = [0]
+    indices = []
+    data = []
+    for speaker_code, num_sources, has_official_source, text_indices, text_values in rows:
+        indices.append(np.arange(NUM_NUMERIC_FEATURES, dtype=np.int32))
+        data.append(np.array([speaker_code, num_sources, has_official_source], dtype=np.float32))
+        indices.append(text_indices + NUM_NUMERIC_FEATURES)
+        data.append(text_values)
+        indptr.append(indptr[-1] + NUM_NUMERIC_FEATURES + len(text_indices))
+
+    return csr_matrix(
+        (np.concatenate(data), np.concatenate(indices), np.array(indptr)),
+        shape=(len(rows), NUM_NUMERIC_FEATURES + num_text_features)
+    )
+
+
+def rescore_history(predictor: Predictor, model=None, model_version: str = "current",
+                    block_size: int = 10000) -> dict:
+    """
+    Re-score every stored prediction with `model` (defaults to the loaded one).
+    Reads stored feature vectors in blocks and writes results to rescore_<model_version>.
+    """
+    model = model if model is not None else predictor.model
+    table = _results_table(model_version)
+    num_text_features = len(predictor.word_vector.vocabulary_)
+    real_index = list(model.classes_).index(1)
+
+    conn = storage.connect(predictor.db_path)
+    cursor = conn.cursor()
+    _init_results_table(cursor, table)
+    conn.commit()
+
+    stats = {"table": table, "rescored": 0, "reused_vectors": 0, "reextracted": 0}
+    start = time.perf_counter()
+
+    # Walk each monthly partition by id range so every block is an index seek
+    for partition in storage.active_partitions(cursor):
+        _rescore_partition(predictor, model, conn, partition, table, real_index,
+                           num_text_features, block_size, stats)
+
+    conn.close()
+    stats["seconds"] = round(time.perf_counter() - start, 3)
+    return stats
+
+
+def _rescore_partition(predictor, model, conn, partition, table, real_index,
+                       num_text_features, block_size, stats):
+    cursor = conn.cursor()
+    last_id = 0
+
+    while True:
+        cursor.execute(f"""
+            SELECT p.id, p.prediction, f.feature_version, f.speaker_code, f.num_sources,
+                   f.has_official_source, f.text_indices, f.text_values
+            FROM {partition} p
+            LEFT JOIN prediction_features f ON f.prediction_id = p.id
+            WHERE p.id > ?
+            ORDER BY p.id
+            LIMIT ?
+        """, (last_id, block_size))
+        block = cursor.fetchall()
+        if not block:
+            break
+        last_id = block[-1][0]
+
+        # Vectors written by a different vectorizer/encoder can't be reused
+        stale_ids = [row[0] for row in block if row[2] != predictor.feature_version]
+        reextracted = _reextract(predictor, cursor, stale_ids) if stale_ids else {}
+
+        rows = []
+        for prediction_id, _, version, speaker_code, num_sources, has_official, idx_blob, val_blob in block:
+            if prediction_id in reextracted:
+                rows.append(reextracted[prediction_id])
+            else:
+                text_indices, text_values = unpack_text_features(idx_blob, val_blob)
+                rows.append((speaker_code, num_sources, has_official, text_indices, text_values))
+
+        probabilities = model.predict_proba(_build_matrix(rows, num_text_features))
+        rescored_at = datetime.now().isoformat()
+        cursor.executemany(f"""
+            INSERT OR REPLACE INTO {table}
+            (prediction_id, original_prediction, prediction, confidence, prob_fake, prob_real, rescored_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, [
+            (
+                row[0],
+                row[1],
+                "Real" if probs.argmax() == real_index else "Fake",
+                float(probs.max()),
+                float(probs[1 - real_index]),
+                float(probs[real_index]),
+                rescored_at
+            )
+            for row, probs in zip(block, probabilities)
+        ])
+        conn.commit()
+
+        stats["rescored"] += len(block)
+        stats["reextracted"] += len(reextracted)
+        stats["reused_vectors"] += len(block) - len(reextracted)
+        print(f"Rescored {stats['rescored']} predictions into {table}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-score prediction history with a new model.")
+    parser.add_argument("--model", help="Path to the new model (defaults to the currently deployed one)")
+    parser.add_argument("--model-version", required=True, help="Version label, used to name the results table")
+    parser.add_argument("--block-size", type=int, default=10000, help="Rows per inference batch")
+    args = parser.parse_args()
+
+    predictor = Predictor()
+    new_model = joblib.load(args.model) if args.model else None
+    print(rescore_history(predictor, new_model, args.model_version, args.block_size))
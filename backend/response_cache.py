@@ -0,0 +1,82 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+
+# Distinct cached responses kept (timeline responses are keyed by their query parameters)
+MAX_ENTRIES = 64
+
+# Make browsers revalidate every poll (If-None-Match) instead of reusing a stale copy
+CACHE_CONTROL = "private, no-cache"
+
+
+class ResponseCache():
+    """
+    Serialized JSON responses keyed by endpoint, each tagged with the data
+    version it was built from. Only the latest version per key is kept, and
+    the least recently used keys are evicted beyond `max_entries`.
+    """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, version: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] == version:
+                self._entries.move_to_end(key)
+                return entry[1]
+        return None
+
+    def put(self, key: str, version: str, body: bytes):
+        with self._lock:
+            self._entries[key] = (version, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+response_cache = ResponseCache()
+
+
+def _not_modified(request: Request, etag: str, last_modified: float) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        candidates = [tag.strip() for tag in if_none_match.split(",")]
+        return etag in candidates or f"W/{etag}" in candidates or "*" in candidates
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(last_modified) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def conditional_json(request: Request, key: str, version: str, last_modified: float, build) -> Response:
+    """
+    Answer a GET with 304 when the client already has `version`, otherwise
+    serve the cached body for `version`, calling build() only on a cache miss.
+    """
+    # Keys carry query parameters; hashing keeps the ETag a valid, ASCII-only header value
+    etag = f'"{hashlib.sha256(key.encode()).hexdigest()[:16]}-{version}"'
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(last_modified, usegmt=True),
+        "Cache-Control": CACHE_CONTROL
+    }
+
+    if _not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+
+    body = response_cache.get(key, version)
+    if body is None:
+        body = JSONResponse(content=build()).body
+        response_cache.put(key, version, body)
+    return Response(content=body, media_type="application/json", headers=headers)
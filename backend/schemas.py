@@ -1,3 +1,4 @@
+from typing import List
 from pydantic import BaseModel, Field, field_validator
 
 #user input class which is for input data validation
@@ -7,6 +8,11 @@ class UserInput(BaseModel):
     speaker: str = Field(default="", description="Person or organization")
     sources: str = Field(default="", description="Comma-separated URLs or source list")
 
+#batch job submission (JSON body variant of POST /jobs)
+class JobRequest(BaseModel):
+    items: List[UserInput] = Field(..., min_length=1, description="Inputs to predict")
+    save_to_history: bool = Field(default=False, description="Also store the predictions in the history")
+
 #username and password schemas
 class CreateUser(BaseModel):
     username: str = Field(..., min_length=3, max_length=50, description="Username (3-50 characters)")
@@ -0,0 +1,122 @@
+import html
+import re
+import time
+
+from backend import storage
+
+# Column weights for bm25(): statement, article text, speaker
+BM25_WEIGHTS = (2.0, 1.0, 1.5)
+SNIPPET_CHARS = 160
+MAX_TERMS = 16
+
+_TOKEN = re.compile(r'"[^"]+"|\S+')
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+class InvalidSearchQuery(ValueError):
+    """Raised when a search query contains no searchable terms."""
+
+
+def parse_query(q: str) -> tuple:
+    """
+    Turn free text into an FTS5 MATCH expression.
+    Every term is quoted so user input can't inject FTS5 syntax; "quoted phrases"
+    stay phrases, and a trailing * keeps prefix matching (e.g. obam*).
+    Returns (match_expression, highlight_words).
+    """
+    parts = []
+    words = []
+    for token in _TOKEN.findall(q or "")[:MAX_TERMS]:
+        prefix = token.endswith("*") and not token.startswith('"')
+        text = token.strip('"').rstrip("*")
+        token_words = _WORD.findall(text)
+        if not token_words:
+            continue
+        words.extend(token_words)
+        parts.append('"' + " ".join(token_words) + '"' + ("*" if prefix else ""))
+
+    if not parts:
+        raise InvalidSearchQuery("Search query must contain at least one word")
+    return " AND ".join(parts), words
+
+
+def _snippet(text: str, words: list) -> str:
+    """Window of `text` around the first matching word, HTML-escaped with <mark> highlights."""
+    if not text:
+        return ""
+    pattern = re.compile(r"\b(" + "|".join(re.escape(w) for w in words) + r")\w*", re.IGNORECASE)
+    match = pattern.search(text)
+    start = max(0, match.start() - SNIPPET_CHARS // 3) if match else 0
+    end = min(len(text), start + SNIPPET_CHARS)
+    window = text[start:end]
+
+    highlighted = []
+    position = 0
+    for m in pattern.finditer(window):
+        highlighted.append(html.escape(window[position:m.start()]))
+        highlighted.append("<mark>" + html.escape(m.group(0)) + "</mark>")
+        position = m.end()
+    highlighted.append(html.escape(window[position:]))
+
+    return ("…" if start > 0 else "") + "".join(highlighted) + ("…" if end < len(text) else "")
+
+
+def search_history(db_path: str, q: str, page: int = 1, page_size: int = 20) -> dict:
+    """
+    BM25-ranked full-text search over stored statements, article text and speakers.
+    Ranking and paging happen inside the FTS5 index; only the requested page is
+    joined back to the history rows for snippets.
+    """
+    match, words = parse_query(q)
+    started = time.perf_counter()
+    conn = storage.connect(db_path)
+    cursor = conn.cursor()
+
+    cursor.execute("SELECT COUNT(*) FROM prediction_search WHERE prediction_search MATCH ?", (match,))
+    total = cursor.fetchone()[0]
+
+    cursor.execute(f"""
+        SELECT rowid, bm25(prediction_search, {", ".join(str(w) for w in BM25_WEIGHTS)}) AS score
+        FROM prediction_search
+        WHERE prediction_search MATCH ?
+        ORDER BY score
+        LIMIT ? OFFSET ?
+    """, (match, page_size, (page - 1) * page_size))
+    ranked = cursor.fetchall()
+
+    rows = {}
+    if ranked:
+        placeholders = ",".join("?" * len(ranked))
+        rows = {
+            row[0]: row
+            for row in storage.fetch_history(cursor, f"WHERE id IN ({placeholders})", [row[0] for row in ranked])
+        }
+    conn.close()
+
+    results = []
+    for prediction_id, score in ranked:
+        row = rows.get(prediction_id)
+        # Archived or otherwise removed rows not yet dropped from the index
+        if row is None:
+            continue
+        results.append({
+            "id": prediction_id,
+            # bm25() is lower-is-better; flip it so higher means more relevant
+            "score": round(-score, 4),
+            "speaker": row[3],
+            "prediction": row[5],
+            "confidence": row[6],
+            "timestamp": row[10],
+            "statement_snippet": _snippet(row[1], words),
+            "article_snippet": _snippet(row[2], words)
+        })
+
+    return {
+        "query": q,
+        "match": match,
+        "page": page,
+        "page_size": page_size,
+        "total_matches": total,
+        "took_ms": round(1000 * (time.perf_counter() - started), 2),
+        "data": results
+    }
@@ -0,0 +1,877 @@
+import argparse
+import gzip
+import hashlib
+import os
+import shutil
+import sqlite3
+import time
+import zlib
+from datetime import datetime
+
+from dotenv import load_dotenv
+
+# Settings below may come from .env; load it before reading them
+load_dotenv()
+
+# Prediction history database (shared with the Predictor)
+DB_PATH = "prediction.db"
+
+# Texts shorter than this are stored uncompressed (zlib overhead outweighs the gain)
+COMPRESS_MIN_BYTES = 64
+ZLIB_LEVEL = 6
+
+# Partitions older than this many months are moved to compressed archive files (0, the default, keeps everything online)
+RETENTION_MONTHS = int(os.getenv("PREDICTION_RETENTION_MONTHS", "0"))
+ARCHIVE_DIR = os.getenv("PREDICTION_ARCHIVE_DIR", "archive")
+# Rows / pages handled per write transaction by maintenance jobs, so writers are never blocked for long
+MAINTENANCE_BATCH = 2000
+# Gap between those transactions; a waiting writer's busy handler retries about every 100 ms
+MAINTENANCE_PAUSE_SECONDS = 0.1
+
+# Partition key of legacy rows without a timestamp; never archived by retention
+UNDATED_MONTH = "0000-00"
+
+# Columns of a partition table (text columns hold text_blobs hashes)
+PARTITION_COLUMNS = (
+    "id, statement_ref, fulltext_ref, speaker, sources, prediction, confidence, num_sources, "
+    "has_official_source, risk_level, timestamp, input_completeness"
+)
+# Stand-in for the unified view when no partition is online yet
+EMPTY_PARTITION = (
+    "SELECT NULL AS id, NULL AS statement_ref, NULL AS fulltext_ref, NULL AS speaker, NULL AS sources, "
+    "NULL AS prediction, NULL AS confidence, NULL AS num_sources, NULL AS has_official_source, "
+    "NULL AS risk_level, NULL AS timestamp, NULL AS input_completeness"
+)
+
+# Columns of the legacy predictions table, in their original order
+HISTORY_COLUMNS = (
+    "id", "statement", "fullText_based_content", "speaker", "sources", "prediction",
+    "confidence", "num_sources", "has_official_source", "risk_level", "timestamp",
+    "input_completeness"
+)
+
+
+def _inflate(codec, data):
+    """SQL function: decode a text_blobs row back into text."""
+    if data is None:
+        return None
+    if codec == "zlib":
+        data = zlib.decompress(data)
+    return bytes(data).decode("utf-8")
+
+
+def active_partitions(cursor) -> list:
+    """Names of the online partition tables, oldest month first."""
+    cursor.execute("SELECT name FROM prediction_partitions WHERE state = 'active' ORDER BY month")
+    return [row[0] for row in cursor.fetchall()]
+
+
+def connect(db_path: str) -> sqlite3.Connection:
+    """
+    Open the prediction database through the unified query layer.
+    The temporary `predictions` view spans every active monthly partition and
+    `prediction_history` additionally resolves the text columns, in the same
+    column order as the legacy table.
+    """
+    conn = sqlite3.connect(db_path)
+    conn.create_function("inflate", 2, _inflate, deterministic=True)
+    _create_views(conn.cursor())
+    return conn
+
+
+def _create_views(cursor):
+    """(Re)build the temporary views over the partitions active right now."""
+    cursor.execute("DROP VIEW IF EXISTS temp.prediction_history")
+    cursor.execute("DROP VIEW IF EXISTS temp.predictions")
+
+    partitions = active_partitions(cursor)
+    if partitions:
+        union = " UNION ALL ".join(f"SELECT {PARTITION_COLUMNS} FROM {name}" for name in partitions)
+    else:
+        union = f"SELECT {PARTITION_COLUMNS} FROM ({EMPTY_PARTITION}) WHERE 0"
+    cursor.execute(f"CREATE TEMP VIEW predictions AS {union}")
+
+    cursor.execute("""
+        CREATE TEMP VIEW prediction_history AS
+        SELECT
+            p.id,
+            inflate(s.codec, s.data) AS statement,
+            inflate(f.codec, f.data) AS fullText_based_content,
+            p.speaker,
+            p.sources,
+            p.prediction,
+            p.confidence,
+            p.num_sources,
+            p.has_official_source,
+            p.risk_level,
+            p.timestamp,
+            p.input_completeness
+        FROM predictions p
+        LEFT JOIN text_blobs s ON s.hash = p.statement_ref
+        LEFT JOIN text_blobs f ON f.hash = p.fulltext_ref
+    """)
+
+
+def resolve_texts(cursor, hashes) -> dict:
+    """Map text_blobs hashes to their text, decompressing each distinct blob once."""
+    distinct = list(set(h for h in hashes if h is not None))
+    texts = {}
+    for i in range(0, len(distinct), 500):
+        chunk = distinct[i:i + 500]
+        cursor.execute(
+            f"SELECT hash, codec, data FROM text_blobs WHERE hash IN ({','.join('?' * len(chunk))})", chunk
+        )
+        for digest, codec, data in cursor.fetchall():
+            texts[digest] = _inflate(codec, data)
+    return texts
+
+
+def fetch_history(cursor, clause: str = "ORDER BY id DESC", params=(), source: str = "predictions") -> list:
+    """
+    History rows in the legacy column order (HISTORY_COLUMNS) with text resolved.
+    `clause` follows FROM (WHERE / ORDER BY / LIMIT). Unlike the prediction_history
+    view, text shared by many rows (e.g. one article) is decompressed only once.
+    """
+    cursor.execute(f"SELECT {PARTITION_COLUMNS} FROM {source} {clause}", params)
+    rows = cursor.fetchall()
+    texts = resolve_texts(cursor, [row[1] for row in rows] + [row[2] for row in rows])
+    return [(row[0], texts.get(row[1]), texts.get(row[2])) + tuple(row[3:]) for row in rows]
+
+
+def _create_text_blobs_table(cursor):
+    # Deduplicated, compressed statement / article text keyed by content hash
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS text_blobs (
+            hash TEXT PRIMARY KEY,
+            codec TEXT NOT NULL,
+            raw_size INTEGER NOT NULL,
+            data BLOB
+        )
+    """)
+
+
+def _create_predictions_table(cursor, name: str = "predictions", autoincrement: bool = True):
+    # Partitions take their ids from prediction_ids, so they don't need AUTOINCREMENT
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS {name} (
+            id INTEGER PRIMARY KEY{" AUTOINCREMENT" if autoincrement else ""},
+            statement_ref TEXT,
+            fulltext_ref TEXT,
+            speaker TEXT,
+            sources TEXT,
+            prediction TEXT,
+            confidence REAL,
+            num_sources INTEGER,
+            has_official_source INTEGER,
+            risk_level TEXT,
+            timestamp TEXT,
+            input_completeness REAL
+        )
+    """)
+
+
+def _create_predictions_indexes(cursor, name: str = "predictions"):
+    # Needed to garbage-collect blobs when predictions are deleted
+    cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{name}_statement_ref ON {name}(statement_ref)")
+    cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{name}_fulltext_ref ON {name}(fulltext_ref)")
+    # Covers the time-bucketed timeline queries without touching the table rows
+    cursor.execute(f"DROP INDEX IF EXISTS idx_{name}_timestamp")
+    cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{name}_timeline ON {name}(timestamp, prediction, confidence)")
+
+
+def _partition_month(timestamp) -> str:
+    """'YYYY-MM' partition key of an ISO timestamp; undated legacy rows go to UNDATED_MONTH."""
+    if not timestamp or len(timestamp) < 7:
+        return UNDATED_MONTH
+    return timestamp[:7]
+
+
+def _partition_name(month: str) -> str:
+    return "predictions_" + month.replace("-", "_")
+
+
+def _ensure_partition(cursor, month: str) -> str:
+    """Return the partition table for a month, creating it on first use."""
+    cursor.execute("SELECT name, state FROM prediction_partitions WHERE month = ?", (month,))
+    row = cursor.fetchone()
+    if row and row[1] == "active":
+        return row[0]
+
+    name = _partition_name(month)
+    _create_predictions_table(cursor, name, autoincrement=False)
+    _create_predictions_indexes(cursor, name)
+    # A late write into an archived month reopens it; the existing archive file is kept
+    cursor.execute("""
+        INSERT INTO prediction_partitions (name, month, state) VALUES (?, ?, 'active')
+        ON CONFLICT(name) DO UPDATE SET state = 'active'
+    """, (name, month))
+    return name
+
+
+def _create_catalog_tables(cursor):
+    # Global id allocator, also maps every online prediction id to its partition
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS prediction_ids (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            partition TEXT NOT NULL
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_prediction_ids_partition ON prediction_ids(partition)")
+    # Change counters behind the cheap history version token (ETag)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS history_meta (
+            key TEXT PRIMARY KEY,
+            value REAL NOT NULL
+        )
+    """)
+    cursor.execute("INSERT OR IGNORE INTO history_meta (key, value) VALUES ('deletes', 0), ('modified_at', ?)", (time.time(),))
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS prediction_partitions (
+            name TEXT PRIMARY KEY,
+            month TEXT NOT NULL UNIQUE,
+            state TEXT NOT NULL DEFAULT 'active',
+            row_count INTEGER,
+            archive_path TEXT,
+            archived_at TEXT
+        )
+    """)
+
+
+def _create_search_index(cursor) -> bool:
+    """Create the FTS5 index over statement, article text and speaker; True if it is new.
+
+    The index is contentless (the text already lives compressed in text_blobs), so
+    rows are removed with FTS5 'delete' commands carrying the originally indexed values.
+    """
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'prediction_search'")
+    if cursor.fetchone() is not None:
+        return False
+    cursor.execute("""
+        CREATE VIRTUAL TABLE prediction_search USING fts5(
+            statement, article, speaker,
+            content = '',
+            tokenize = 'unicode61 remove_diacritics 2'
+        )
+    """)
+    return True
+
+
+def _index_prediction(cursor, prediction_id: int, statement, fullText, speaker):
+    cursor.execute(
+        "INSERT INTO prediction_search (rowid, statement, article, speaker) VALUES (?, ?, ?, ?)",
+        (prediction_id, statement, fullText, speaker)
+    )
+
+
+def _unindex_predictions(cursor, partition: str, ids: list):
+    """Remove predictions of a partition from the search index (needs a connect() connection)."""
+    placeholders = ",".join("?" * len(ids))
+    cursor.execute(f"""
+        SELECT p.id, inflate(s.codec, s.data), inflate(f.codec, f.data), p.speaker
+        FROM {partition} p
+        LEFT JOIN text_blobs s ON s.hash = p.statement_ref
+        LEFT JOIN text_blobs f ON f.hash = p.fulltext_ref
+        WHERE p.id IN ({placeholders})
+    """, ids)
+    for prediction_id, statement, fullText, speaker in cursor.fetchall():
+        # Rows written before the index existed (and never rebuilt) must not be "deleted"
+        cursor.execute("SELECT 1 FROM prediction_search WHERE rowid = ?", (prediction_id,))
+        if cursor.fetchone() is None:
+            continue
+        cursor.execute("""
+            INSERT INTO prediction_search (prediction_search, rowid, statement, article, speaker)
+            VALUES ('delete', ?, ?, ?, ?)
+        """, (prediction_id, statement, fullText, speaker))
+
+
+def rebuild_search_index(db_path: str, batch_size: int = MAINTENANCE_BATCH) -> dict:
+    """
+    (Re)index every online prediction in the full-text search index.
+    Safe on a live database: each batch is its own short write transaction, so
+    /predict saves are not held up. Searches see partial results until it finishes.
+    """
+    init_db(db_path)
+    conn = connect(db_path)
+    conn.isolation_level = None
+    cursor = conn.cursor()
+    start = time.perf_counter()
+
+    # Rows saved after the reset index themselves, so only ids up to last_id are rebuilt
+    cursor.execute("BEGIN IMMEDIATE")
+    cursor.execute("INSERT INTO prediction_search (prediction_search) VALUES ('delete-all')")
+    cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'prediction_ids'")
+    row = cursor.fetchone()
+    last_id = row[0] if row else 0
+    partitions = active_partitions(cursor)
+    cursor.execute("COMMIT")
+
+    indexed = 0
+    for partition in partitions:
+        after_id = 0
+        while True:
+            # Read and index in one transaction so a concurrent delete can't leave a stale entry
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute("SELECT state FROM prediction_partitions WHERE name = ?", (partition,))
+            state = cursor.fetchone()
+            rows = []
+            if state is not None and state[0] == "active":
+                rows = fetch_history(
+                    cursor, "WHERE id > ? AND id <= ? ORDER BY id LIMIT ?",
+                    (after_id, last_id, batch_size), source=partition
+                )
+                cursor.executemany(
+                    "INSERT INTO prediction_search (rowid, statement, article, speaker) VALUES (?, ?, ?, ?)",
+                    [(r[0], r[1], r[2], r[3]) for r in rows]
+                )
+            cursor.execute("COMMIT")
+            if not rows:
+                break
+            after_id = rows[-1][0]
+            indexed += len(rows)
+            time.sleep(MAINTENANCE_PAUSE_SECONDS)
+
+    # Merge index segments a step at a time instead of one long 'optimize' transaction
+    while True:
+        changes_before = conn.total_changes
+        cursor.execute("INSERT INTO prediction_search (prediction_search, rank) VALUES ('merge', 500)")
+        if conn.total_changes - changes_before < 2:
+            break
+        time.sleep(MAINTENANCE_PAUSE_SECONDS)
+
+    conn.close()
+    return {"indexed": indexed, "seconds": round(time.perf_counter() - start, 3)}
+
+
+def _has_single_table(cursor) -> bool:
+    """True for databases that still keep all predictions in one table."""
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'predictions'")
+    return cursor.fetchone() is not None
+
+
+def _has_inline_text(cursor) -> bool:
+    cursor.execute("PRAGMA table_info(predictions)")
+    return "fullText_based_content" in [row[1] for row in cursor.fetchall()]
+
+
+def init_db(db_path: str):
+    """Create the prediction tables, migrating legacy single-table databases if needed."""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    cursor.execute("PRAGMA auto_vacuum")
+    auto_vacuum = cursor.fetchone()[0]
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE name IN ('predictions', 'text_blobs')")
+    if auto_vacuum != 2 and cursor.fetchone() is None:
+        # Fresh prediction store (at most the small auth tables exist): switch to
+        # incremental auto-vacuum now so compaction never needs a blocking VACUUM
+        cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        cursor.execute("VACUUM")
+    # WAL lets /history readers and the maintenance job run alongside writers
+    cursor.execute("PRAGMA journal_mode = WAL")
+
+    if _has_inline_text(cursor):
+        conn.close()
+        print(f"Legacy predictions table found, migrating text to blob storage: {migrate_inline_text(db_path)}")
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+
+    _create_text_blobs_table(cursor)
+    _create_catalog_tables(cursor)
+    conn.commit()
+
+    if _has_single_table(cursor):
+        conn.close()
+        print(f"Single predictions table found, migrating to monthly partitions: {migrate_to_partitions(db_path)}")
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+
+    # Bring indexes of existing partitions up to date
+    for name in active_partitions(cursor):
+        _create_predictions_indexes(cursor, name)
+
+    if _create_search_index(cursor):
+        cursor.execute("SELECT 1 FROM prediction_ids LIMIT 1")
+        if cursor.fetchone() is not None:
+            print("Full-text search index created; run 'python -m backend.storage rebuild-search' to index existing predictions")
+
+    # Compact feature vectors, used to re-score history without re-tokenizing
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS prediction_features (
+            prediction_id INTEGER PRIMARY KEY,
+            feature_version TEXT NOT NULL,
+            speaker_code INTEGER,
+            num_sources INTEGER,
+            has_official_source INTEGER,
+            nnz INTEGER,
+            text_indices BLOB,
+            text_values BLOB
+        )
+    """)
+    # Batch-job items already written to the history, recorded in the same transaction
+    # so a batch re-run after a crash doesn't save them twice (see jobs.JobWorkerPool)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS job_saved_items (
+            job_id TEXT NOT NULL,
+            seq INTEGER NOT NULL,
+            prediction_id INTEGER,
+            PRIMARY KEY (job_id, seq)
+        ) WITHOUT ROWID
+    """)
+    conn.commit()
+    conn.close()
+
+
+def saved_job_items(cursor, job_id: str, seqs: list) -> set:
+    """The subset of `seqs` of a batch job that is already in the history."""
+    cursor.execute(
+        f"SELECT seq FROM job_saved_items WHERE job_id = ? AND seq IN ({','.join('?' * len(seqs))})",
+        [job_id] + list(seqs)
+    )
+    return set(row[0] for row in cursor.fetchall())
+
+
+def mark_job_item_saved(cursor, job_id: str, seq: int, prediction_id: int):
+    cursor.execute(
+        "INSERT OR REPLACE INTO job_saved_items (job_id, seq, prediction_id) VALUES (?, ?, ?)",
+        (job_id, seq, prediction_id)
+    )
+
+
+def clear_saved_job_items(db_path: str, job_id: str, seqs: list):
+    """Drop save markers once the job queue has recorded the items as done."""
+    conn = sqlite3.connect(db_path)
+    conn.executemany("DELETE FROM job_saved_items WHERE job_id = ? AND seq = ?", [(job_id, seq) for seq in seqs])
+    conn.commit()
+    conn.close()
+
+
+def put_text(cursor, text):
+    """Store text in text_blobs (once per distinct content) and return its hash."""
+    if text is None:
+        return None
+    raw = text.encode("utf-8")
+    digest = hashlib.sha256(raw).hexdigest()
+
+    cursor.execute("SELECT 1 FROM text_blobs WHERE hash = ?", (digest,))
+    if cursor.fetchone() is None:
+        if len(raw) >= COMPRESS_MIN_BYTES:
+            codec, data = "zlib", zlib.compress(raw, ZLIB_LEVEL)
+        else:
+            codec, data = "raw", raw
+        cursor.execute(
+            "INSERT OR IGNORE INTO text_blobs (hash, codec, raw_size, data) VALUES (?, ?, ?, ?)",
+            (digest, codec, len(raw), data)
+        )
+    return digest
+
+
+def insert_prediction(cursor, statement, fullText, speaker, sources, result) -> int:
+    """Insert one prediction row into its monthly partition and return its id."""
+    partition = _ensure_partition(cursor, _partition_month(result["metadata"]["timestamp"]))
+    cursor.execute("INSERT INTO prediction_ids (partition) VALUES (?)", (partition,))
+    prediction_id = cursor.lastrowid
+
+    cursor.execute(f"""
+        INSERT INTO {partition}
+        (id, statement_ref, fulltext_ref, speaker, sources, prediction, confidence, num_sources, has_official_source, risk_level, timestamp, input_completeness)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, (
+        prediction_id,
+        put_text(cursor, statement),
+        put_text(cursor, fullText),
+        speaker,
+        sources,
+        result["prediction"],
+        result["confidence"],
+        result["extracted_features"]["num_sources"],
+        int(result["extracted_features"]["has_official_source"]),
+        result["trust_indicators"]["risk_level"],
+        result["metadata"]["timestamp"],
+        result["explainability"]["input_completeness"]
+    ))
+    _index_prediction(cursor, prediction_id, statement, fullText, speaker)
+    _touch_history(cursor)
+    return prediction_id
+
+
+def _touch_history(cursor, deleted: int = 0):
+    """Record a change to the history (deleted > 0 for removals) for history_version()."""
+    if deleted:
+        cursor.execute("UPDATE history_meta SET value = value + ? WHERE key = 'deletes'", (deleted,))
+    cursor.execute("UPDATE history_meta SET value = ? WHERE key = 'modified_at'", (time.time(),))
+
+
+def history_version(db_path: str) -> tuple:
+    """
+    Cheap version token of the online history: (max prediction id, delete count, modified_at).
+    Two indexed lookups, so polling clients can be answered without running the real query.
+    """
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'prediction_ids'")
+    row = cursor.fetchone()
+    max_id = row[0] if row else 0
+    cursor.execute("SELECT key, value FROM history_meta WHERE key IN ('deletes', 'modified_at')")
+    meta = dict(cursor.fetchall())
+    conn.close()
+    return max_id, int(meta.get("deletes", 0)), meta.get("modified_at", 0.0)
+
+
+def _collect_orphan_blobs(cursor, refs):
+    """Delete the given text blobs unless an online prediction still references them."""
+    cursor.executemany("""
+        DELETE FROM text_blobs
+        WHERE hash = ?
+          AND NOT EXISTS (SELECT 1 FROM predictions WHERE statement_ref = ?)
+          AND NOT EXISTS (SELECT 1 FROM predictions WHERE fulltext_ref = ?)
+    """, [(ref, ref, ref) for ref in refs])
+
+
+def delete_prediction(cursor, prediction_id: int) -> bool:
+    """Delete a prediction, its feature vector, search entry and any text no longer referenced.
+
+    `cursor` must come from a connect() connection.
+    """
+    cursor.execute("SELECT partition FROM prediction_ids WHERE id = ?", (prediction_id,))
+    row = cursor.fetchone()
+    if row is None:
+        return False
+    partition = row[0]
+
+    cursor.execute(f"SELECT statement_ref, fulltext_ref FROM {partition} WHERE id = ?", (prediction_id,))
+    refs = set(r for r in (cursor.fetchone() or ()) if r is not None)
+
+    _unindex_predictions(cursor, partition, [prediction_id])
+    cursor.execute(f"DELETE FROM {partition} WHERE id = ?", (prediction_id,))
+    cursor.execute("DELETE FROM prediction_ids WHERE id = ?", (prediction_id,))
+    cursor.execute("DELETE FROM prediction_features WHERE prediction_id = ?", (prediction_id,))
+    _collect_orphan_blobs(cursor, refs)
+    _touch_history(cursor, deleted=1)
+    return True
+
+
+def _db_size(cursor) -> int:
+    cursor.execute("PRAGMA page_count")
+    page_count = cursor.fetchone()[0]
+    cursor.execute("PRAGMA page_size")
+    return page_count * cursor.fetchone()[0]
+
+
+def _time_scan(cursor) -> float:
+    """Time a full-table aggregate, as run by /admin/model-performance."""
+    start = time.perf_counter()
+    cursor.execute("""
+        SELECT prediction, COUNT(*), AVG(confidence), AVG(num_sources)
+        FROM predictions
+        GROUP BY prediction
+    """)
+    cursor.fetchall()
+    return time.perf_counter() - start
+
+
+def _time_history(cursor, blob_layout: bool) -> float:
+    """Time the full /history read, with text inline or resolved from text_blobs."""
+    start = time.perf_counter()
+    if blob_layout:
+        fetch_history(cursor)
+    else:
+        cursor.execute(f"SELECT {', '.join(HISTORY_COLUMNS)} FROM predictions ORDER BY id DESC")
+        cursor.fetchall()
+    return time.perf_counter() - start
+
+
+def migrate_inline_text(db_path: str, batch_size: int = 5000) -> dict:
+    """
+    Rewrite a legacy predictions table (text stored inline) into the blob layout.
+    Ids are preserved. Returns size and scan-time figures before and after.
+    """
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    if not _has_inline_text(cursor):
+        conn.close()
+        return {"migrated": 0}
+
+    size_before = _db_size(cursor)
+    scan_before = _time_scan(cursor)
+    cursor.execute("PRAGMA table_info(predictions)")
+    existing = set(row[1] for row in cursor.fetchall())
+    history_before = _time_history(cursor, blob_layout=False) if existing.issuperset(HISTORY_COLUMNS) else None
+    cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'predictions'")
+    row = cursor.fetchone()
+    last_seq = row[0] if row else 0
+
+    _create_text_blobs_table(cursor)
+    cursor.execute("DROP TABLE IF EXISTS predictions_migrated")
+    _create_predictions_table(cursor, "predictions_migrated")
+
+    # Tables from before risk_level/timestamp/input_completeness existed lack those columns
+    select = ", ".join(c if c in existing else f"NULL AS {c}" for c in HISTORY_COLUMNS)
+
+    read_cursor = conn.cursor()
+    read_cursor.execute(f"SELECT {select} FROM predictions ORDER BY id")
+    migrated = 0
+    while True:
+        rows = read_cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        cursor.executemany("""
+            INSERT INTO predictions_migrated
+            (id, statement_ref, fulltext_ref, speaker, sources, prediction, confidence, num_sources, has_official_source, risk_level, timestamp, input_completeness)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, [
+            (row[0], put_text(cursor, row[1]), put_text(cursor, row[2])) + tuple(row[3:])
+            for row in rows
+        ])
+        migrated += len(rows)
+
+    cursor.execute("DROP TABLE predictions")
+    cursor.execute("ALTER TABLE predictions_migrated RENAME TO predictions")
+    # Keep AUTOINCREMENT from reusing ids of rows deleted before the migration
+    cursor.execute("UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = 'predictions'", (last_seq,))
+    _create_predictions_indexes(cursor)
+    conn.commit()
+
+    cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    cursor.execute("VACUUM")
+    cursor.execute("SELECT COUNT(*), COALESCE(SUM(raw_size), 0) FROM text_blobs")
+    distinct_texts, distinct_text_bytes = cursor.fetchone()
+    size_after = _db_size(cursor)
+    scan_after = _time_scan(cursor)
+    history_after = _time_history(cursor, blob_layout=True)
+    conn.close()
+
+    return {
+        "migrated": migrated,
+        "distinct_texts": distinct_texts,
+        "distinct_text_bytes": distinct_text_bytes,
+        "size_before_bytes": size_before,
+        "size_after_bytes": size_after,
+        "size_saved_pct": round(100 * (1 - size_after / size_before), 1) if size_before else 0.0,
+        "scan_before_ms": round(scan_before * 1000, 2),
+        "scan_after_ms": round(scan_after * 1000, 2),
+        "history_before_ms": round(history_before * 1000, 2) if history_before is not None else None,
+        "history_after_ms": round(history_after * 1000, 2)
+    }
+
+
+def migrate_to_partitions(db_path: str) -> dict:
+    """
+    Split a single predictions table into monthly partition tables.
+    Ids are preserved and registered in prediction_ids.
+    """
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    if not _has_single_table(cursor):
+        conn.close()
+        return {"migrated": 0}
+
+    _create_catalog_tables(cursor)
+    cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'predictions'")
+    row = cursor.fetchone()
+    last_seq = row[0] if row else 0
+
+    cursor.execute("SELECT DISTINCT substr(timestamp, 1, 7) FROM predictions")
+    months = sorted(set(_partition_month(row[0]) for row in cursor.fetchall()))
+    for month in months:
+        partition = _ensure_partition(cursor, month)
+        month_filter = "timestamp IS NULL OR length(timestamp) < 7" if month == UNDATED_MONTH else "substr(timestamp, 1, 7) = ?"
+        params = () if month == UNDATED_MONTH else (month,)
+        cursor.execute(f"INSERT INTO {partition} SELECT {PARTITION_COLUMNS} FROM predictions WHERE {month_filter}", params)
+        cursor.execute(f"INSERT INTO prediction_ids (id, partition) SELECT id, ? FROM {partition}", (partition,))
+
+    cursor.execute("SELECT COUNT(*) FROM prediction_ids")
+    migrated = cursor.fetchone()[0]
+    cursor.execute("DROP TABLE predictions")
+    # Keep AUTOINCREMENT from reusing ids of rows deleted before the migration
+    cursor.execute("UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = 'prediction_ids'", (last_seq,))
+    conn.commit()
+
+    cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    cursor.execute("VACUUM")
+    conn.close()
+    return {"migrated": migrated, "partitions": months}
+
+
+def _month_offset(month: str, months_back: int) -> str:
+    year, mon = int(month[:4]), int(month[5:7])
+    index = year * 12 + (mon - 1) - months_back
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+
+def archive_partition(db_path: str, name: str, archive_dir: str = ARCHIVE_DIR) -> dict:
+    """
+    Move one partition to a gzip-compressed, standalone SQLite file
+    (its rows, feature vectors and referenced text), then drop it online.
+    Online deletes are done in small batches so writers are not held up.
+    """
+    os.makedirs(archive_dir, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d%H%M%S")
+    archive_db = os.path.join(archive_dir, f"{name}_{stamp}.db")
+    archive_path = archive_db + ".gz"
+
+    # Hide the partition from the unified view before anything is removed
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE prediction_partitions SET state = 'archiving' WHERE name = ?", (name,))
+    _touch_history(conn.cursor(), deleted=1)
+    conn.commit()
+    conn.close()
+
+    conn = connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,))
+    if cursor.fetchone() is None:
+        # Interrupted after the drop: the archive file was already written
+        cursor.execute("UPDATE prediction_partitions SET state = 'archived' WHERE name = ?", (name,))
+        conn.commit()
+        conn.close()
+        return {"partition": name, "rows": 0, "archive_path": None}
+
+    cursor.execute("ATTACH DATABASE ? AS archive", (archive_db,))
+    cursor.execute(f"CREATE TABLE archive.predictions AS SELECT * FROM main.{name}")
+    cursor.execute(f"""
+        CREATE TABLE archive.prediction_features AS
+        SELECT f.* FROM prediction_features f JOIN main.{name} p ON p.id = f.prediction_id
+    """)
+    cursor.execute(f"""
+        CREATE TABLE archive.text_blobs AS
+        SELECT * FROM text_blobs WHERE hash IN (
+            SELECT statement_ref FROM main.{name} UNION SELECT fulltext_ref FROM main.{name}
+        )
+    """)
+    conn.commit()
+    cursor.execute("DETACH DATABASE archive")
+
+    with open(archive_db, "rb") as src, gzip.open(archive_path, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(archive_db)
+
+    cursor.execute(f"SELECT COUNT(*) FROM {name}")
+    row_count = cursor.fetchone()[0]
+    cursor.execute(f"SELECT statement_ref FROM {name} UNION SELECT fulltext_ref FROM {name}")
+    refs = [row[0] for row in cursor.fetchall() if row[0] is not None]
+
+    while True:
+        cursor.execute(f"SELECT id FROM {name} LIMIT ?", (MAINTENANCE_BATCH,))
+        ids = [(row[0],) for row in cursor.fetchall()]
+        if not ids:
+            break
+        _unindex_predictions(cursor, name, [row[0] for row in ids])
+        cursor.executemany("DELETE FROM prediction_features WHERE prediction_id = ?", ids)
+        cursor.executemany("DELETE FROM prediction_ids WHERE id = ?", ids)
+        cursor.executemany(f"DELETE FROM {name} WHERE id = ?", ids)
+        conn.commit()
+        time.sleep(MAINTENANCE_PAUSE_SECONDS)
+
+    cursor.execute(f"DROP TABLE {name}")
+    cursor.execute("""
+        UPDATE prediction_partitions
+        SET state = 'archived', row_count = ?, archive_path = ?, archived_at = ?
+        WHERE name = ?
+    """, (row_count, archive_path, datetime.now().isoformat(), name))
+    conn.commit()
+    conn.close()
+
+    for start in range(0, len(refs), MAINTENANCE_BATCH):
+        conn = connect(db_path)
+        cursor = conn.cursor()
+        # Rebuild the view under the write lock: a partition created since the
+        # archive started (and any text it references) must count as live
+        cursor.execute("BEGIN IMMEDIATE")
+        _create_views(cursor)
+        _collect_orphan_blobs(cursor, refs[start:start + MAINTENANCE_BATCH])
+        conn.commit()
+        conn.close()
+        time.sleep(MAINTENANCE_PAUSE_SECONDS)
+
+    print(f"Archived partition {name} ({row_count} rows) to {archive_path}")
+    return {"partition": name, "rows": row_count, "archive_path": archive_path}
+
+
+def apply_retention(db_path: str, retention_months: int = RETENTION_MONTHS,
+                    archive_dir: str = ARCHIVE_DIR) -> list:
+    """
+    Archive every active partition older than the retention window.
+    Undated legacy rows have no age, so their partition always stays online.
+    """
+    if retention_months <= 0:
+        return []
+
+    cutoff = _month_offset(datetime.now().strftime("%Y-%m"), retention_months)
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    # 'archiving' partitions are leftovers from an interrupted run and are retried
+    cursor.execute("""
+        SELECT name FROM prediction_partitions
+        WHERE state IN ('active', 'archiving') AND month < ? AND month != ?
+        ORDER BY month
+    """, (cutoff, UNDATED_MONTH))
+    cold = [row[0] for row in cursor.fetchall()]
+    conn.close()
+
+    return [archive_partition(db_path, name, archive_dir) for name in cold]
+
+
+def compact(db_path: str, max_batches: int = 50) -> dict:
+    """
+    Return free pages to the OS with incremental vacuum, a few pages per
+    transaction, then checkpoint the WAL without waiting on readers.
+    """
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    cursor = conn.cursor()
+    cursor.execute("PRAGMA auto_vacuum")
+    if cursor.fetchone()[0] != 2:
+        conn.close()
+        print("Incremental vacuum is not enabled; run 'python -m backend.storage vacuum' once during a maintenance window")
+        return {"freed_pages": 0}
+
+    freed = 0
+    for _ in range(max_batches):
+        cursor.execute("PRAGMA freelist_count")
+        free_pages = cursor.fetchone()[0]
+        if free_pages == 0:
+            break
+        # executescript steps the pragma to completion (execute() frees a single page)
+        conn.executescript(f"PRAGMA incremental_vacuum({min(free_pages, MAINTENANCE_BATCH)});")
+        freed += min(free_pages, MAINTENANCE_BATCH)
+        time.sleep(MAINTENANCE_PAUSE_SECONDS)
+
+    cursor.execute("PRAGMA wal_checkpoint(PASSIVE)")
+    cursor.fetchall()
+    conn.close()
+    return {"freed_pages": freed}
+
+
+def run_maintenance(db_path: str) -> dict:
+    """One pass of the background job: retention, then compaction."""
+    return {"archived": apply_retention(db_path), "compaction": compact(db_path)}
+
+
+def full_vacuum(db_path: str):
+    """Offline, blocking VACUUM that also switches the file to incremental auto-vacuum."""
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    conn.execute("VACUUM")
+    conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prediction database maintenance.")
+    parser.add_argument(
+        "command", choices=["migrate", "maintain", "vacuum", "rebuild-search"],
+        help="migrate: upgrade a legacy database; maintain: apply retention and compact; "
+             "vacuum: offline full VACUUM; rebuild-search: rebuild the full-text search index"
+    )
+    parser.add_argument("--db", default="prediction.db", help="Path to the prediction database")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        raise SystemExit(f"Database not found: {args.db}")
+    if args.command == "migrate":
+        print(migrate_inline_text(args.db))
+        print(migrate_to_partitions(args.db))
+    elif args.command == "maintain":
+        print(run_maintenance(args.db))
+    elif args.command == "rebuild-search":
+        print(rebuild_search_index(args.db))
+    else:
+        full_vacuum(args.db)
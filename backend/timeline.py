@@ -0,0 +1,165 @@
+import numpy as np
+
+from backend import storage
+
+LABELS = ("Real", "Fake")
+# Bucket key expressions over the ISO timestamp; prefixes keep the timestamp index usable
+BUCKET_EXPRESSIONS = {
+    "hour": "substr(timestamp, 1, 13) || ':00'",
+    "day": "substr(timestamp, 1, 10)"
+}
+# Confidence series are first averaged in SQL into this many time slots per returned point
+SERIES_OVERSAMPLE = 4
+
+
+def lttb(xs: np.ndarray, ys: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+    Returns the indices of the (at most `threshold`) points to keep, first and last included.
+    """
+    n = len(xs)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    # Interior points are split into threshold - 2 equal buckets
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+
+    previous = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], max(edges[i + 1], edges[i] + 1)
+        if i + 2 < len(edges):
+            next_start, next_end = edges[i + 1], max(edges[i + 2], edges[i + 1] + 1)
+        else:
+            next_start, next_end = n - 1, n
+        avg_x = xs[next_start:next_end].mean()
+        avg_y = ys[next_start:next_end].mean()
+
+        # Keep the point forming the largest triangle with the previous pick and the next bucket's mean
+        areas = np.abs(
+            (xs[previous] - avg_x) * (ys[start:end] - ys[previous])
+            - (xs[previous] - xs[start:end]) * (avg_y - ys[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        selected[i + 1] = previous
+
+    return selected
+
+
+def _time_filter(start, end) -> tuple:
+    clauses = ["timestamp IS NOT NULL"]
+    params = []
+    if start:
+        clauses.append("timestamp >= ?")
+        params.append(start)
+    if end:
+        clauses.append("timestamp < ?")
+        params.append(end)
+    return " AND ".join(clauses), params
+
+
+def build_timeline(db_path: str, bucket: str = "auto", points: int = 500,
+                   start: str = None, end: str = None) -> dict:
+    """
+    Server-side aggregates for the history charts: per-bucket counts by label,
+    day-of-week x hour heatmap cells, and confidence series averaged into time
+    slots in SQL, then LTTB-downsampled. Every part is bounded by `points`
+    (or by 7 x 24 x labels for the heatmap), and no per-row work runs in Python.
+    """
+    where, params = _time_filter(start, end)
+    conn = storage.connect(db_path)
+    cursor = conn.cursor()
+
+    cursor.execute(f"SELECT COUNT(*), MIN(timestamp), MAX(timestamp) FROM predictions WHERE {where}", params)
+    total, first, last = cursor.fetchone()
+
+    if bucket == "auto":
+        # Hourly buckets while they fit in the requested point budget
+        cursor.execute("SELECT (julianday(?) - julianday(?)) * 24", (last, first))
+        span_hours = cursor.fetchone()[0] or 0
+        bucket = "hour" if span_hours < points else "day"
+
+    # Most recent `points` buckets, returned oldest first
+    cursor.execute(f"""
+        SELECT bucket, prediction, count, avg_confidence FROM (
+            SELECT {BUCKET_EXPRESSIONS[bucket]} AS bucket, prediction,
+                   COUNT(*) AS count, AVG(confidence) AS avg_confidence
+            FROM predictions
+            WHERE {where}
+            GROUP BY bucket, prediction
+        )
+        WHERE bucket IN (
+            SELECT DISTINCT {BUCKET_EXPRESSIONS[bucket]} AS b FROM predictions
+            WHERE {where} ORDER BY b DESC LIMIT ?
+        )
+        ORDER BY bucket, prediction
+    """, params + params + [points])
+    counts = [
+        {"bucket": row[0], "prediction": row[1], "count": row[2], "avg_confidence": round(row[3] or 0, 4)}
+        for row in cursor.fetchall()
+    ]
+
+    # %w is 0 = Sunday, matching Date.getDay() in the frontend
+    cursor.execute(f"""
+        SELECT CAST(strftime('%w', timestamp) AS INTEGER) AS day_of_week,
+               CAST(strftime('%H', timestamp) AS INTEGER) AS hour,
+               prediction, COUNT(*), AVG(confidence)
+        FROM predictions
+        WHERE {where}
+        GROUP BY day_of_week, hour, prediction
+        ORDER BY day_of_week, hour, prediction
+    """, params)
+    heatmap = [
+        {"day_of_week": row[0], "hour": row[1], "prediction": row[2], "count": row[3], "avg_confidence": round(row[4] or 0, 4)}
+        for row in cursor.fetchall()
+    ]
+
+    # Equal-width time slots over the whole range, so SQL returns at most `slots` rows per label
+    slots = points * SERIES_OVERSAMPLE
+    cursor.execute("SELECT julianday(?), julianday(?) - julianday(?)", (first, last, first))
+    first_day, span_days = cursor.fetchone()
+    scale = slots / span_days if span_days else 0
+
+    # Filters go inside each partition's branch so every branch reads only its timeline index
+    partitions = storage.active_partitions(cursor)
+    branches = " UNION ALL ".join(
+        f"SELECT timestamp, confidence FROM {name} WHERE {where} AND prediction = ?" for name in partitions
+    )
+
+    confidence_series = {}
+    for label in LABELS:
+        rows = []
+        if partitions:
+            cursor.execute(f"""
+                SELECT MIN(?, CAST((julianday(timestamp) - ?) * ? AS INTEGER)) AS slot,
+                       MIN(timestamp), AVG((julianday(timestamp) - 2440587.5) * 86400.0),
+                       AVG(confidence), MIN(confidence), MAX(confidence), COUNT(*)
+                FROM ({branches})
+                GROUP BY slot
+                ORDER BY slot
+            """, [slots - 1, first_day or 0, scale] + (params + [label]) * len(partitions))
+            rows = cursor.fetchall()
+        xs = np.array([row[2] for row in rows], dtype=np.float64)
+        ys = np.array([row[3] or 0 for row in rows], dtype=np.float64)
+        keep = lttb(xs, ys, points)
+        confidence_series[label] = {
+            "timestamps": [rows[i][1] for i in keep],
+            "confidences": [round(float(ys[i]), 4) for i in keep],
+            "min_confidences": [round(rows[i][4] or 0, 4) for i in keep],
+            "max_confidences": [round(rows[i][5] or 0, 4) for i in keep],
+            "source_points": sum(row[6] for row in rows)
+        }
+
+    conn.close()
+    return {
+        "bucket": bucket,
+        "points": points,
+        "total_records": total,
+        "first_timestamp": first,
+        "last_timestamp": last,
+        "counts": counts,
+        "heatmap": heatmap,
+        "confidence_series": confidence_series
+    }
@@ -0,0 +1,149 @@
+import os
+import sqlite3
+
+import joblib
+import numpy as np
+import pytest
+from scipy.sparse import csr_matrix, hstack
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import LabelEncoder
+
+from backend import jobs, storage
+from backend.inference import InferenceExecutor
+from backend.predictor import Predictor
+
+# Article text shared by every legacy row (long enough to be zlib-compressed)
+SHARED_ARTICLE = "The senate passed the bill after a long debate on health care costs. " * 20
+
+
+def make_result(timestamp, prediction="Fake", confidence=0.9):
+    """Minimal Predictor result, as consumed by storage.insert_prediction."""
+    return {
+        "prediction": prediction,
+        "confidence": confidence,
+        "extracted_features": {"num_sources": 1, "has_official_source": False},
+        "trust_indicators": {"risk_level": "High"},
+        "metadata": {"timestamp": timestamp},
+        "explainability": {"input_completeness": 100.0}
+    }
+
+
+@pytest.fixture
+def result_factory():
+    return make_result
+
+
+@pytest.fixture
+def legacy_db(tmp_path):
+    """
+    A database in the original single-table layout with inline text:
+    dated rows in two months, one undated row, and a deleted last row so
+    the AUTOINCREMENT counter is ahead of MAX(id).
+    """
+    db_path = str(tmp_path / "legacy.db")
+    conn = sqlite3.connect(db_path)
+    conn.execute("""
+        CREATE TABLE predictions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            statement TEXT,
+            fullText_based_content TEXT,
+            speaker TEXT,
+            sources TEXT,
+            prediction TEXT,
+            confidence REAL,
+            num_sources INTEGER,
+            has_official_source INTEGER,
+            risk_level TEXT,
+            timestamp TEXT,
+            input_completeness REAL
+        )
+    """)
+    rows = [
+        ("Obama signed the health bill", SHARED_ARTICLE, "barack-obama", "a.gov", "Real", 0.8, 1, 1, "Low", "2020-01-05T10:00:00", 100.0),
+        ("Taxes doubled last year", SHARED_ARTICLE, "donald-trump", "", "Fake", 0.7, 0, 0, "High", "2020-01-20T09:30:00", 50.0),
+        ("Unemployment is at a record low", SHARED_ARTICLE, "joe-biden", "b.com", "Real", 0.6, 1, 0, "Medium", "2020-02-02T08:00:00", 75.0),
+        ("Row saved before timestamps existed", SHARED_ARTICLE, "unknown", "", "Fake", 0.9, 0, 0, None, None, None),
+        ("Deleted later", "", "", "", "Fake", 0.5, 0, 0, "High", "2020-02-03T08:00:00", 25.0),
+    ]
+    conn.executemany("INSERT INTO predictions VALUES (NULL, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+    conn.execute("DELETE FROM predictions WHERE id = 5")
+    conn.commit()
+    conn.close()
+    return db_path
+
+
+@pytest.fixture
+def partitioned_db(tmp_path, result_factory):
+    """A fresh database with two predictions in an old month and one far in the future."""
+    db_path = str(tmp_path / "prediction.db")
+    storage.init_db(db_path)
+    conn = storage.connect(db_path)
+    cursor = conn.cursor()
+    for statement, timestamp in [
+        ("Old claim about the border wall", "2020-03-01T12:00:00"),
+        ("Another old claim about taxes", "2020-03-15T12:00:00"),
+        ("Recent claim about the border wall", "2099-01-01T12:00:00"),
+    ]:
+        storage.insert_prediction(cursor, statement, SHARED_ARTICLE, "speaker", "", result_factory(timestamp))
+    conn.commit()
+    conn.close()
+    return db_path
+
+
+TRAINING_TEXTS = [
+    "the senate passed a bill on health care",
+    "aliens built the pyramids says blogger",
+    "unemployment fell to four percent",
+    "vaccine contains microchips claims post",
+] * 10
+TRAINING_LABELS = [1, 0, 1, 0] * 10
+
+
+def train_model(word_vector, random_state=0, n_estimators=10):
+    """A small forest over the Predictor feature layout (3 numeric columns, then TF-IDF)."""
+    numeric = csr_matrix(np.array([[i % 3, i % 2, i % 2] for i in range(len(TRAINING_TEXTS))]))
+    features = hstack([numeric, word_vector.transform(TRAINING_TEXTS)]).tocsr()
+    return RandomForestClassifier(n_estimators=n_estimators, random_state=random_state).fit(features, TRAINING_LABELS)
+
+
+@pytest.fixture
+def model_dir(tmp_path, monkeypatch):
+    """
+    Synthetic models in ./models, with the working directory moved to tmp_path
+    (Predictor and the default database paths are relative to it).
+    """
+    os.makedirs(tmp_path / "models")
+    word_vector = TfidfVectorizer(max_features=500).fit(TRAINING_TEXTS)
+    speaker_le = LabelEncoder().fit(["barack-obama", "donald-trump", "other"])
+    joblib.dump(train_model(word_vector), tmp_path / "models" / "RF_model.joblib")
+    joblib.dump(word_vector, tmp_path / "models" / "tfidf_vectorizer.joblib")
+    joblib.dump(speaker_le, tmp_path / "models" / "speaker_label_encoder.joblib")
+    monkeypatch.chdir(tmp_path)
+    return tmp_path / "models"
+
+
+@pytest.fixture
+def predictor(model_dir):
+    return Predictor()
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    """
+    The backend.main module against fresh databases in tmp_path. Startup hooks
+    (model loading, maintenance) only run inside `with TestClient(api.app)`.
+    """
+    monkeypatch.chdir(tmp_path)
+    from backend import auth, main, response_cache
+
+    auth.init_users_table()
+    storage.init_db(storage.DB_PATH)
+    jobs.init_jobs_db()
+    monkeypatch.setattr(main, "predictor", None)
+    monkeypatch.setattr(main, "model_state", {"status": "loading", "error": None, "timings": {}})
+    monkeypatch.setattr(main, "job_workers", jobs.JobWorkerPool())
+    monkeypatch.setattr(main, "inference_executor", InferenceExecutor())
+    monkeypatch.setattr(main, "MAINTENANCE_INTERVAL_SECONDS", 0)
+    monkeypatch.setattr(response_cache, "response_cache", response_cache.ResponseCache())
+    return main
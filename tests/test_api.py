@@ -0,0 +1,135 @@
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend import storage
+from backend.predictor import Predictor
+
+
+def _insert(result_factory, *timestamps):
+    conn = storage.connect(storage.DB_PATH)
+    cursor = conn.cursor()
+    for i, timestamp in enumerate(timestamps):
+        storage.insert_prediction(cursor, f"statement {timestamp} {i}", "", "speaker", "", result_factory(timestamp))
+    conn.commit()
+    conn.close()
+
+
+@pytest.fixture
+def admin_headers(api):
+    from backend import auth
+
+    auth.create_user("admin", "admin-password", is_admin=True)
+    return {"Authorization": f"Bearer {auth.create_access_token({'sub': 'admin'})}"}
+
+
+@pytest.mark.parametrize("params", [{"start": "中"}, {"start": 'a"b'}, {"end": "2025-13-01"}])
+def test_timeline_rejects_malformed_bounds(api, params):
+    response = TestClient(api.app).get("/history/timeline", params=params)
+    assert response.status_code == 400
+
+
+def test_timeline_etag_is_independent_of_raw_parameters(api):
+    client = TestClient(api.app)
+
+    first = client.get("/history/timeline", params={"start": "2025-01-01"})
+    same = client.get("/history/timeline", params={"start": "2025-01-01T00:00:00"})
+
+    assert first.status_code == 200
+    assert first.headers["etag"] == same.headers["etag"]
+    assert first.headers["etag"].isascii() and "2025" not in first.headers["etag"]
+
+
+def test_history_conditional_get(api, result_factory):
+    client = TestClient(api.app)
+    _insert(result_factory, "2025-01-01T00:00:00", "2025-01-02T00:00:00")
+
+    first = client.get("/history")
+    etag = first.headers["etag"]
+    assert first.json()["total_records"] == 2
+    assert first.headers["cache-control"] == "private, no-cache"
+
+    unchanged = client.get("/history", headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304
+    assert unchanged.content == b""
+    assert client.get("/history", headers={"If-None-Match": f"W/{etag}"}).status_code == 304
+
+    _insert(result_factory, "2025-01-03T00:00:00")
+    changed = client.get("/history", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert changed.json()["total_records"] == 3
+
+
+def test_deleting_the_newest_prediction_invalidates_history(api, result_factory, admin_headers):
+    client = TestClient(api.app)
+    _insert(result_factory, "2025-01-01T00:00:00", "2025-01-02T00:00:00")
+    etag = client.get("/history").headers["etag"]
+
+    # The newest id is gone but the id sequence does not move back
+    assert client.delete("/history/2", headers=admin_headers).status_code == 200
+
+    response = client.get("/history", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert [row["id"] for row in response.json()["data"]] == [1]
+
+
+def test_archiving_a_partition_invalidates_history(api, result_factory, tmp_path):
+    client = TestClient(api.app)
+    _insert(result_factory, "2020-03-01T00:00:00", "2099-01-01T00:00:00")
+    etag = client.get("/history").headers["etag"]
+
+    storage.archive_partition(storage.DB_PATH, "predictions_2020_03", str(tmp_path / "archive"))
+
+    response = client.get("/history", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert [row["id"] for row in response.json()["data"]] == [2]
+
+
+def _wait_ready(client, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        response = client.get("/ready")
+        if response.status_code != 503 or response.json()["detail"]["status"] != "loading":
+            return response
+        time.sleep(0.05)
+    raise AssertionError("model did not finish loading")
+
+
+def test_ready_gates_traffic_until_the_model_is_warm(api, model_dir, monkeypatch):
+    release = threading.Event()
+
+    class SlowPredictor(Predictor):
+        def __init__(self):
+            release.wait(10)
+            super().__init__()
+
+    monkeypatch.setattr(api, "Predictor", SlowPredictor)
+    with TestClient(api.app) as client:
+        ready = client.get("/ready")
+        assert ready.status_code == 503
+        assert ready.headers["retry-after"] == str(api.MODEL_LOADING_RETRY_AFTER)
+        assert ready.json()["detail"]["status"] == "loading"
+
+        predict = client.post("/predict", json={"statement": "the senate passed a bill"})
+        assert predict.status_code == 503
+        assert "retry-after" in predict.headers
+        # Liveness stays green so the orchestrator doesn't restart a loading container
+        assert client.get("/health").status_code == 200
+
+        release.set()
+        ready = _wait_ready(client)
+        assert ready.status_code == 200
+        assert "warmup" in ready.json()["load_timings"]
+        assert client.post("/predict", json={"statement": "the senate passed a bill"}).status_code == 200
+
+
+def test_failed_model_load_is_unhealthy(api):
+    # No models directory in the working directory, so loading fails
+    with TestClient(api.app) as client:
+        ready = _wait_ready(client)
+        assert ready.status_code == 503
+        assert ready.json()["detail"]["status"] == "failed"
+        assert client.get("/health").status_code == 503
@@ -0,0 +1,42 @@
+import threading
+
+import pytest
+
+from backend.inference import ExecutorSaturated, InferenceExecutor
+
+
+def test_rejects_beyond_workers_plus_queue():
+    executor = InferenceExecutor(max_workers=1, max_queue=1)
+    release = threading.Event()
+    try:
+        running = executor.submit(release.wait, 5)
+        queued = executor.submit(lambda: "done")
+
+        with pytest.raises(ExecutorSaturated) as rejected:
+            executor.submit(lambda: "rejected")
+        assert rejected.value.retry_after >= 1
+
+        release.set()
+        assert running.result(timeout=5) is True
+        assert queued.result(timeout=5) == "done"
+        # Finished work frees its slot again
+        assert executor.submit(lambda: 42).result(timeout=5) == 42
+
+        metrics = executor.metrics()
+        assert metrics["admitted_total"] == 3
+        assert metrics["rejected_total"] == 1
+        assert metrics["completed_total"] == 3
+    finally:
+        release.set()
+        executor.shutdown()
+
+
+def test_failures_release_their_slot():
+    executor = InferenceExecutor(max_workers=1, max_queue=0)
+    try:
+        with pytest.raises(ZeroDivisionError):
+            executor.submit(lambda: 1 / 0).result(timeout=5)
+        assert executor.submit(lambda: "ok").result(timeout=5) == "ok"
+        assert executor.metrics()["failed_total"] == 1
+    finally:
+        executor.shutdown()
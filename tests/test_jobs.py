@@ -0,0 +1,115 @@
+import json
+import sqlite3
+import time
+
+from backend import jobs, storage
+
+
+def _items(count):
+    return [{"statement": f"the senate passed bill number {i}", "speaker": "barack-obama"} for i in range(count)]
+
+
+def _history_count(db_path):
+    conn = storage.connect(db_path)
+    count = conn.execute("SELECT COUNT(*) FROM predictions").fetchone()[0]
+    conn.close()
+    return count
+
+
+def _pool(predictor, tmp_path, **kwargs):
+    db_path = str(tmp_path / "jobs.db")
+    jobs.init_jobs_db(db_path)
+    pool = jobs.JobWorkerPool(db_path=db_path, **kwargs)
+    pool.predictor = predictor
+    return pool
+
+
+def _wait_for(job_id, db_path, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = jobs.get_job(job_id, db_path)
+        if job["status"] == "completed":
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"job did not complete: {job}")
+
+
+def test_claim_takes_the_oldest_job_in_order(tmp_path):
+    db_path = str(tmp_path / "jobs.db")
+    jobs.init_jobs_db(db_path)
+    first = jobs.create_job(_items(3), "user", db_path=db_path)
+    second = jobs.create_job(_items(1), "user", db_path=db_path)
+    pool = jobs.JobWorkerPool(batch_size=2, db_path=db_path)
+
+    job_id, save_to_history, items = pool._claim()
+    assert (job_id, save_to_history) == (first["job_id"], False)
+    assert [seq for seq, _ in items] == [0, 1]
+    assert items[0][1]["statement"] == "the senate passed bill number 0"
+    assert jobs.get_job(job_id, db_path)["status"] == "running"
+
+    # Claimed items are not handed out twice
+    assert [seq for seq, _ in pool._claim()[2]] == [2]
+    job_id, _, items = pool._claim()
+    assert (job_id, [seq for seq, _ in items]) == (second["job_id"], [0])
+    assert pool._claim() is None
+
+
+def test_recover_requeues_interrupted_claims(tmp_path):
+    db_path = str(tmp_path / "jobs.db")
+    jobs.init_jobs_db(db_path)
+    jobs.create_job(_items(3), "user", db_path=db_path)
+    pool = jobs.JobWorkerPool(batch_size=2, db_path=db_path)
+    pool._claim()
+
+    assert pool.recover() == 2
+    assert [seq for seq, _ in pool._claim()[2]] == [0, 1]
+
+
+def test_worker_retries_a_batch_after_a_storage_error(predictor, tmp_path, monkeypatch):
+    monkeypatch.setattr(jobs, "RETRY_DELAY_SECONDS", 0)
+    pool = _pool(predictor, tmp_path, workers=1, batch_size=10)
+    save_batch = predictor._save_batch_to_db
+    calls = []
+
+    def locked_once(*args, **kwargs):
+        calls.append(1)
+        if len(calls) == 1:
+            raise sqlite3.OperationalError("database is locked")
+        return save_batch(*args, **kwargs)
+
+    monkeypatch.setattr(predictor, "_save_batch_to_db", locked_once)
+    items = _items(3) + [{"statement": "", "speaker": "nobody"}]
+    job = jobs.create_job(items, "user", save_to_history=True, db_path=pool.db_path)
+
+    pool.start(predictor)
+    try:
+        finished = _wait_for(job["job_id"], pool.db_path)
+    finally:
+        pool.stop()
+
+    assert len(calls) == 2
+    assert (finished["processed_items"], finished["failed_items"]) == (4, 1)
+    lines = [json.loads(line) for line in jobs.iter_results(job["job_id"], db_path=pool.db_path)]
+    assert [(line["seq"], line["status"]) for line in lines] == [(0, "done"), (1, "done"), (2, "done"), (3, "failed")]
+    assert _history_count(predictor.db_path) == 3
+    conn = sqlite3.connect(predictor.db_path)
+    assert conn.execute("SELECT COUNT(*) FROM job_saved_items").fetchone()[0] == 0
+    conn.close()
+
+
+def test_rerun_after_crash_between_save_and_complete_does_not_duplicate_history(predictor, tmp_path):
+    pool = _pool(predictor, tmp_path, workers=1, batch_size=10)
+    job = jobs.create_job(_items(5), "user", save_to_history=True, db_path=pool.db_path)
+
+    job_id, _, items = pool._claim()
+    pool._save(job_id, items, pool._predict(items))
+    # The process dies here, before _complete: the restart re-queues the claimed items
+    assert pool.recover() == 5
+
+    job_id, _, items = pool._claim()
+    outcomes = pool._predict(items)
+    pool._save(job_id, items, outcomes)
+    pool._complete(job_id, items, outcomes)
+
+    assert _history_count(predictor.db_path) == 5
+    assert jobs.get_job(job["job_id"], pool.db_path)["status"] == "completed"
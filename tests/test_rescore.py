@@ -0,0 +1,54 @@
+import sqlite3
+
+import pytest
+
+from backend.rescore import rescore_history
+
+ITEMS = [
+    {"statement": "the senate passed a bill on health care", "speaker": "barack-obama", "sources": "https://example.gov/a"},
+    {"statement": "aliens built the pyramids says blogger", "speaker": "donald-trump"},
+    {"statement": "unemployment fell to four percent", "fullText_based_content": "the senate passed a bill", "speaker": "nobody"},
+    {"statement": "vaccine contains microchips claims post", "sources": "https://example.com/b;https://example.gov/c"},
+]
+
+
+def _rescored(db_path, table):
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute(f"SELECT prediction_id, original_prediction, prediction, confidence FROM {table} ORDER BY prediction_id").fetchall()
+    conn.close()
+    return rows
+
+
+def test_rescore_reuses_stored_vectors(predictor):
+    results = predictor.predict_batch(ITEMS)
+
+    stats = rescore_history(predictor, model_version="v1.0", block_size=3)
+
+    assert stats["table"] == "rescore_v1_0"
+    assert (stats["rescored"], stats["reused_vectors"], stats["reextracted"]) == (4, 4, 0)
+    # The same model over the stored vectors reproduces the original predictions
+    rows = _rescored(predictor.db_path, stats["table"])
+    assert [row[0] for row in rows] == [1, 2, 3, 4]
+    for row, result in zip(rows, results):
+        assert row[1] == row[2] == result["prediction"]
+        assert row[3] == pytest.approx(result["confidence"], abs=1e-6)
+
+
+def test_rescore_reextracts_missing_and_stale_vectors(predictor):
+    results = predictor.predict_batch(ITEMS)
+    conn = sqlite3.connect(predictor.db_path)
+    conn.execute("UPDATE prediction_features SET feature_version = 'older-vectorizer' WHERE prediction_id = 2")
+    conn.execute("DELETE FROM prediction_features WHERE prediction_id = 3")
+    conn.commit()
+    conn.close()
+
+    stats = rescore_history(predictor, model_version="v2")
+
+    assert (stats["rescored"], stats["reused_vectors"], stats["reextracted"]) == (4, 2, 2)
+    assert [row[2] for row in _rescored(predictor.db_path, stats["table"])] == [r["prediction"] for r in results]
+    # Re-extracted vectors are stored again, so the next run takes the fast path
+    conn = sqlite3.connect(predictor.db_path)
+    versions = {row[0] for row in conn.execute("SELECT feature_version FROM prediction_features")}
+    conn.close()
+    assert versions == {predictor.feature_version}
+    assert rescore_history(predictor, model_version="v2")["reextracted"] == 0
@@ -0,0 +1,43 @@
+import pytest
+
+from backend import storage
+from backend.search import InvalidSearchQuery, parse_query, search_history
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("obama", '"obama"'),
+    ("barack obama", '"barack" AND "obama"'),
+    ('"health care" obam*', '"health care" AND "obam"*'),
+    # Hyphens, operators and column filters are not FTS5 syntax here
+    ("barack-obama", '"barack obama"'),
+    ("speaker:obama OR NOT", '"speaker obama" AND "OR" AND "NOT"'),
+])
+def test_parse_query(query, expected):
+    assert parse_query(query)[0] == expected
+
+
+@pytest.mark.parametrize("query", ["", "   ", '"" *** ;;'])
+def test_parse_query_rejects_queries_without_words(query):
+    with pytest.raises(InvalidSearchQuery):
+        parse_query(query)
+
+
+def test_search_history_ranks_pages_and_escapes_snippets(tmp_path, result_factory):
+    db_path = str(tmp_path / "prediction.db")
+    storage.init_db(db_path)
+    conn = storage.connect(db_path)
+    cursor = conn.cursor()
+    storage.insert_prediction(cursor, "Obama <b>said</b> the wall", "", "barack-obama", "", result_factory("2025-01-01T00:00:00"))
+    storage.insert_prediction(cursor, "The wall is unrelated", "Obama mentioned once", "x", "", result_factory("2025-01-02T00:00:00"))
+    storage.insert_prediction(cursor, "Nothing to see", "", "y", "", result_factory("2025-01-03T00:00:00"))
+    conn.commit()
+    conn.close()
+
+    first = search_history(db_path, "obama", page=1, page_size=1)
+    second = search_history(db_path, "obama", page=2, page_size=1)
+
+    assert first["total_matches"] == 2
+    # Statement and speaker matches outrank a single mention in the article
+    assert [r["id"] for r in first["data"] + second["data"]] == [1, 2]
+    assert first["data"][0]["statement_snippet"] == "<mark>Obama</mark> &lt;b&gt;said&lt;/b&gt; the wall"
+    assert search_history(db_path, "obam*")["total_matches"] == 2
@@ -0,0 +1,231 @@
+import gzip
+import shutil
+import sqlite3
+
+import pytest
+
+from backend import storage
+
+
+def _legacy_rows(db_path):
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute(f"SELECT {', '.join(storage.HISTORY_COLUMNS)} FROM predictions ORDER BY id").fetchall()
+    seq = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'predictions'").fetchone()[0]
+    conn.close()
+    return rows, seq
+
+
+def _history(db_path):
+    conn = storage.connect(db_path)
+    rows = storage.fetch_history(conn.cursor(), "ORDER BY id")
+    conn.close()
+    return rows
+
+
+def _tables(db_path):
+    conn = sqlite3.connect(db_path)
+    names = set(row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'"))
+    conn.close()
+    return names
+
+
+def test_legacy_migration_preserves_rows_ids_and_sequence(legacy_db, result_factory):
+    before, seq = _legacy_rows(legacy_db)
+
+    storage.init_db(legacy_db)
+
+    assert _history(legacy_db) == before
+    assert "predictions" not in _tables(legacy_db)
+    assert storage.history_version(legacy_db)[0] == seq
+
+    # The id of the row deleted before the migration is not handed out again
+    conn = storage.connect(legacy_db)
+    new_id = storage.insert_prediction(conn.cursor(), "New", "", "", "", result_factory("2020-02-10T00:00:00"))
+    conn.commit()
+    conn.close()
+    assert new_id == seq + 1
+
+
+def test_legacy_migration_deduplicates_text(legacy_db):
+    storage.init_db(legacy_db)
+
+    conn = sqlite3.connect(legacy_db)
+    codecs = [row[0] for row in conn.execute("SELECT codec FROM text_blobs")]
+    conn.close()
+    # Four distinct statements plus the one shared article (stored once, compressed)
+    assert len(codecs) == 5
+    assert "zlib" in codecs
+
+
+def test_legacy_migration_partitions_by_month_and_keeps_undated_rows(legacy_db):
+    storage.init_db(legacy_db)
+
+    conn = sqlite3.connect(legacy_db)
+    partitions = dict(conn.execute("SELECT month, name FROM prediction_partitions WHERE state = 'active'"))
+    undated_ids = [row[0] for row in conn.execute(f"SELECT id FROM {partitions[storage.UNDATED_MONTH]}")]
+    conn.close()
+
+    assert set(partitions) == {storage.UNDATED_MONTH, "2020-01", "2020-02"}
+    assert undated_ids == [4]
+
+
+def test_migration_of_table_without_timestamp_columns(tmp_path):
+    db_path = str(tmp_path / "old_schema.db")
+    conn = sqlite3.connect(db_path)
+    conn.execute("""
+        CREATE TABLE predictions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, statement TEXT, fullText_based_content TEXT,
+            speaker TEXT, sources TEXT, prediction TEXT, confidence REAL,
+            num_sources INTEGER, has_official_source INTEGER
+        )
+    """)
+    conn.execute("INSERT INTO predictions VALUES (NULL, 'Old row', 'Text', 'x', '', 'Fake', 0.6, 0, 0)")
+    conn.commit()
+    conn.close()
+
+    storage.init_db(db_path)
+
+    assert _history(db_path) == [(1, "Old row", "Text", "x", "", "Fake", 0.6, 0, 0, None, None, None)]
+
+
+def test_init_db_is_idempotent(legacy_db):
+    storage.init_db(legacy_db)
+    migrated = _history(legacy_db)
+
+    storage.init_db(legacy_db)
+
+    assert _history(legacy_db) == migrated
+
+
+def test_archive_round_trip(partitioned_db, tmp_path):
+    online_before = _history(partitioned_db)
+    conn = sqlite3.connect(partitioned_db)
+    conn.execute("""
+        INSERT INTO prediction_features (prediction_id, feature_version, speaker_code, num_sources, has_official_source, nnz)
+        VALUES (1, 'v1', 3, 1, 0, 0)
+    """)
+    conn.commit()
+    conn.close()
+    deletes_before = storage.history_version(partitioned_db)[1]
+
+    result = storage.archive_partition(partitioned_db, "predictions_2020_03", str(tmp_path / "archive"))
+
+    assert result["rows"] == 2
+    # The archive is a standalone database with the rows, their features and their text
+    restored = str(tmp_path / "restored.db")
+    with gzip.open(result["archive_path"], "rb") as src, open(restored, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    archive = sqlite3.connect(restored)
+    archived_ids = [row[0] for row in archive.execute("SELECT id FROM predictions ORDER BY id")]
+    texts = dict(
+        (row[0], storage._inflate(row[1], row[2]))
+        for row in archive.execute("SELECT hash, codec, data FROM text_blobs")
+    )
+    archived_rows = [
+        (row[0], texts.get(row[1]), texts.get(row[2])) + tuple(row[3:])
+        for row in archive.execute(f"SELECT {storage.PARTITION_COLUMNS} FROM predictions ORDER BY id")
+    ]
+    archived_features = [row[0] for row in archive.execute("SELECT prediction_id FROM prediction_features")]
+    archive.close()
+
+    assert archived_ids == [1, 2]
+    assert archived_rows == online_before[:2]
+    assert archived_features == [1]
+
+    # Online, only the other partition remains, along with the text it still references
+    assert _history(partitioned_db) == online_before[2:]
+    conn = sqlite3.connect(partitioned_db)
+    assert conn.execute("SELECT state FROM prediction_partitions WHERE name = 'predictions_2020_03'").fetchone()[0] == "archived"
+    assert conn.execute("SELECT COUNT(*) FROM prediction_ids WHERE id IN (1, 2)").fetchone()[0] == 0
+    assert conn.execute("SELECT COUNT(*) FROM prediction_features").fetchone()[0] == 0
+    assert conn.execute("SELECT COUNT(*) FROM text_blobs").fetchone()[0] == 2
+    conn.close()
+    assert "predictions_2020_03" not in _tables(partitioned_db)
+    assert storage.history_version(partitioned_db)[1] > deletes_before
+
+
+def test_archived_rows_leave_the_search_index(partitioned_db, tmp_path):
+    storage.archive_partition(partitioned_db, "predictions_2020_03", str(tmp_path / "archive"))
+
+    conn = storage.connect(partitioned_db)
+    matches = [row[0] for row in conn.execute("SELECT rowid FROM prediction_search WHERE prediction_search MATCH 'border'")]
+    conn.close()
+    assert matches == [3]
+
+
+def test_archive_keeps_text_referenced_by_a_partition_created_meanwhile(partitioned_db, tmp_path, monkeypatch, result_factory):
+    unindex = storage._unindex_predictions
+
+    def insert_while_archiving(cursor, partition, ids):
+        # A concurrent writer opens a new month that reuses text from the archived rows
+        conn = storage.connect(partitioned_db)
+        storage.insert_prediction(conn.cursor(), "Another old claim about taxes", "", "speaker", "",
+                                  result_factory("2050-06-01T12:00:00"))
+        conn.commit()
+        conn.close()
+        monkeypatch.setattr(storage, "_unindex_predictions", unindex)
+        unindex(cursor, partition, ids)
+
+    monkeypatch.setattr(storage, "_unindex_predictions", insert_while_archiving)
+    storage.archive_partition(partitioned_db, "predictions_2020_03", str(tmp_path / "archive"))
+
+    assert [row[1] for row in _history(partitioned_db)] == [
+        "Recent claim about the border wall", "Another old claim about taxes"
+    ]
+
+
+def test_retention_is_off_by_default(partitioned_db, tmp_path):
+    assert storage.RETENTION_MONTHS == 0
+    assert storage.apply_retention(partitioned_db, archive_dir=str(tmp_path / "archive")) == []
+
+
+def test_retention_never_archives_undated_rows(legacy_db, tmp_path):
+    storage.init_db(legacy_db)
+
+    archived = storage.apply_retention(legacy_db, 12, str(tmp_path / "archive"))
+
+    assert sorted(a["partition"] for a in archived) == ["predictions_2020_01", "predictions_2020_02"]
+    assert [row[0] for row in _history(legacy_db)] == [4]
+
+
+def test_delete_prediction_removes_row_features_search_entry_and_orphan_text(partitioned_db):
+    conn = storage.connect(partitioned_db)
+    cursor = conn.cursor()
+
+    assert storage.delete_prediction(cursor, 3) is True
+    assert storage.delete_prediction(cursor, 3) is False
+    conn.commit()
+
+    assert cursor.execute("SELECT COUNT(*) FROM prediction_search WHERE prediction_search MATCH 'recent'").fetchone()[0] == 0
+    # The statement was only used by the deleted row; the shared article is still referenced
+    assert cursor.execute("SELECT COUNT(*) FROM text_blobs").fetchone()[0] == 3
+    conn.close()
+
+
+def test_rebuild_search_index(legacy_db):
+    storage.init_db(legacy_db)
+    conn = storage.connect(legacy_db)
+    assert conn.execute("SELECT COUNT(*) FROM prediction_search WHERE prediction_search MATCH 'senate'").fetchone()[0] == 0
+    conn.close()
+
+    assert storage.rebuild_search_index(legacy_db)["indexed"] == 4
+
+    conn = storage.connect(legacy_db)
+    assert conn.execute("SELECT COUNT(*) FROM prediction_search WHERE prediction_search MATCH 'senate'").fetchone()[0] == 4
+    conn.close()
+
+
+@pytest.mark.parametrize("month, back, expected", [
+    ("2025-03", 0, "2025-03"),
+    ("2025-03", 2, "2025-01"),
+    ("2025-03", 3, "2024-12"),
+    ("2025-03", 27, "2022-12"),
+])
+def test_month_offset(month, back, expected):
+    assert storage._month_offset(month, back) == expected
+
+
+def test_partition_month():
+    assert storage._partition_month("2025-03-04T10:00:00") == "2025-03"
+    assert storage._partition_month(None) == storage.UNDATED_MONTH
+    assert storage._partition_month("") == storage.UNDATED_MONTH
@@ -0,0 +1,59 @@
+import numpy as np
+
+from backend import storage
+from backend.timeline import build_timeline, lttb
+
+
+def test_lttb_returns_everything_below_threshold():
+    xs = np.arange(5, dtype=np.float64)
+    assert list(lttb(xs, xs, 10)) == [0, 1, 2, 3, 4]
+
+
+def test_lttb_keeps_endpoints_and_spikes():
+    xs = np.arange(1000, dtype=np.float64)
+    ys = np.zeros(1000)
+    ys[500] = 10.0
+
+    keep = lttb(xs, ys, 20)
+
+    assert len(keep) == 20
+    assert keep[0] == 0 and keep[-1] == 999
+    assert 500 in keep
+    assert list(keep) == sorted(keep)
+
+
+def test_build_timeline_is_bounded_by_points(tmp_path, result_factory):
+    db_path = str(tmp_path / "prediction.db")
+    storage.init_db(db_path)
+    conn = storage.connect(db_path)
+    cursor = conn.cursor()
+    for i in range(300):
+        label = "Fake" if i % 3 else "Real"
+        timestamp = f"2025-01-{1 + i // 24:02d}T{i % 24:02d}:00:00"
+        storage.insert_prediction(cursor, f"s{i}", "", "", "", result_factory(timestamp, label, (i % 10) / 10))
+    conn.commit()
+    conn.close()
+
+    timeline = build_timeline(db_path, points=20)
+
+    assert timeline["total_records"] == 300
+    assert timeline["bucket"] == "day"
+    assert len(set(row["bucket"] for row in timeline["counts"])) <= 20
+    for label, expected in (("Fake", 200), ("Real", 100)):
+        series = timeline["confidence_series"][label]
+        assert series["source_points"] == expected
+        assert 0 < len(series["timestamps"]) <= 20
+        assert series["timestamps"] == sorted(series["timestamps"])
+        assert all(lo <= avg <= hi for lo, avg, hi in zip(
+            series["min_confidences"], series["confidences"], series["max_confidences"]
+        ))
+
+
+def test_build_timeline_on_empty_history(tmp_path):
+    db_path = str(tmp_path / "prediction.db")
+    storage.init_db(db_path)
+
+    timeline = build_timeline(db_path)
+
+    assert timeline["total_records"] == 0
+    assert timeline["confidence_series"]["Fake"]["timestamps"] == []